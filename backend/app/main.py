@@ -1,17 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
+from .database import engine, upgrade_schema
+from .services.job_manager import job_manager
 from .routers import (
     course_router,
     class_router,
     faculty_router,
     lesson_router,
     classroom_router,
+    calendar_router,
     timetable_router
 )
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables, and bring tables of an existing database up to date
+upgrade_schema(engine)
 
 app = FastAPI(
     title="Timetable Generator API",
@@ -26,6 +28,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # list pagination cursor
 )
 
 # Include routers
@@ -34,8 +37,13 @@ app.include_router(class_router.router)
 app.include_router(faculty_router.router)
 app.include_router(lesson_router.router)
 app.include_router(classroom_router.router)
+app.include_router(calendar_router.router)
 app.include_router(timetable_router.router)
 
+@app.on_event("shutdown")
+def shutdown_job_workers():
+    job_manager.shutdown()
+
 @app.get("/")
 def root():
     return {
@@ -3,5 +3,7 @@ from .class_model import Class
 from .faculty import Faculty
 from .lesson import Lesson
 from .classroom import Classroom
+from .timetable import TimetableVersion, TimetableSlot
+from .calendar import SchoolCalendar
 
-__all__ = ["Course", "Class", "Faculty", "Lesson", "Classroom"]
+__all__ = ["Course", "Class", "Faculty", "Lesson", "Classroom", "TimetableVersion", "TimetableSlot", "SchoolCalendar"]
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, JSON, Index
+from ..database import Base, DEFAULT_TENANT
+
+class SchoolCalendar(Base):
+    __tablename__ = "school_calendars"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(String, nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
+    name = Column(String, default="Default")
+    days = Column(JSON, default=list)  # Teaching days in order, e.g. ["Monday", ..., "Saturday"]
+    periods_per_day = Column(Integer, default=8)
+    day_periods = Column(JSON, default=dict)  # Period count of days that differ, e.g. {"Saturday": 4}
+    breaks = Column(JSON, default=list)  # 0-based periods never taught, e.g. [4] for lunch
+
+    __table_args__ = (
+        Index("ix_school_calendars_tenant_id", "tenant_id", "id"),
+    )
@@ -1,12 +1,17 @@
-from sqlalchemy import Column, Integer, String, JSON
-from ..database import Base
+from sqlalchemy import Column, Integer, String, JSON, Index
+from ..database import Base, DEFAULT_TENANT
 
 class Class(Base):
     __tablename__ = "classes"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    tenant_id = Column(String, nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
+    name = Column(String, nullable=False, index=True)
     division = Column(String, nullable=True)
     batch_count = Column(Integer, default=1)
     restrictions = Column(JSON, default=dict)  # Custom restrictions
     available_slots = Column(JSON, default=list)  # Available time slots
+
+    __table_args__ = (
+        Index("ix_classes_tenant_id", "tenant_id", "id"),
+    )
@@ -1,14 +1,20 @@
-from sqlalchemy import Column, Integer, String, Boolean, JSON
-from ..database import Base
+from sqlalchemy import Column, Integer, String, Boolean, JSON, Index
+from ..database import Base, DEFAULT_TENANT
 
 class Classroom(Base):
     __tablename__ = "classrooms"
 
     id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(String, nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
     name = Column(String, nullable=False)
     abbreviation = Column(String, nullable=False)
     color = Column(String, default="#10B981")
+    classroom_type = Column(String, default="regular", server_default="regular", index=True)  # Matched against Lesson.classroom_type
     is_homeroom = Column(Boolean, default=False)
     is_shared = Column(Boolean, default=True)
     requires_supervision = Column(Boolean, default=False)
     availability = Column(JSON, default=dict)  # Availability per day/period
+
+    __table_args__ = (
+        Index("ix_classrooms_tenant_id", "tenant_id", "id"),
+    )
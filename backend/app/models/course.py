@@ -1,11 +1,16 @@
-from sqlalchemy import Column, Integer, String, JSON
-from ..database import Base
+from sqlalchemy import Column, Integer, String, JSON, Index
+from ..database import Base, DEFAULT_TENANT
 
 class Course(Base):
     __tablename__ = "courses"
 
     id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(String, nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
     title = Column(String, nullable=False)
-    abbreviation = Column(String, nullable=False)
+    abbreviation = Column(String, nullable=False, index=True)
     color = Column(String, default="#3B82F6")
     available_slots = Column(JSON, default=list)  # List of available time slots
+
+    __table_args__ = (
+        Index("ix_courses_tenant_id", "tenant_id", "id"),
+    )
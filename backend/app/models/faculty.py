@@ -1,18 +1,24 @@
-from sqlalchemy import Column, Integer, String, Boolean, JSON
-from ..database import Base
+from sqlalchemy import Column, Integer, String, Boolean, JSON, Index
+from ..database import Base, DEFAULT_TENANT
 
 class Faculty(Base):
     __tablename__ = "faculties"
 
     id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(String, nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
-    email = Column(String, unique=True, nullable=True)
+    email = Column(String, nullable=True)  # Unique within a tenant
     phone = Column(String, nullable=True)
-    abbreviation = Column(String, nullable=False)
+    abbreviation = Column(String, nullable=False, index=True)
     title = Column(String, default="Mr.")
     gender = Column(String, default="Male")
     is_class_teacher = Column(Boolean, default=False)
     color = Column(String, default="#8B5CF6")
     constraints = Column(JSON, default=dict)  # max_days, max_periods_per_day, etc.
     time_off = Column(JSON, default=list)  # List of unavailable slots
+
+    __table_args__ = (
+        Index("ix_faculties_tenant_id", "tenant_id", "id"),
+        Index("ix_faculties_tenant_email", "tenant_id", "email", unique=True),
+    )
@@ -1,16 +1,21 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON
-from ..database import Base
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Index
+from ..database import Base, DEFAULT_TENANT
 
 class Lesson(Base):
     __tablename__ = "lessons"
 
     id = Column(Integer, primary_key=True, index=True)
-    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
-    class_id = Column(Integer, ForeignKey("classes.id"), nullable=False)
+    tenant_id = Column(String, nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
+    class_id = Column(Integer, ForeignKey("classes.id"), nullable=False, index=True)
     group = Column(String, nullable=True)  # For batch groups
-    faculty_id = Column(Integer, ForeignKey("faculties.id"), nullable=False)
+    faculty_id = Column(Integer, ForeignKey("faculties.id"), nullable=False, index=True)
     periods_per_week = Column(Integer, default=1)
     duration = Column(Integer, default=1)  # Duration in consecutive periods
     shared_faculty_ids = Column(JSON, default=list)  # For co-teaching
     classroom_type = Column(String, default="regular")  # regular, lab, sports, etc.
     constraints = Column(JSON, default=dict)  # Additional constraints
+
+    __table_args__ = (
+        Index("ix_lessons_tenant_id", "tenant_id", "id"),
+    )
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base, DEFAULT_TENANT
+
+class TimetableVersion(Base):
+    __tablename__ = "timetable_versions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(String, nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
+    label = Column(String, nullable=True)
+    # Version this one was rescheduled from; cleared when that version is deleted
+    parent_id = Column(Integer, ForeignKey("timetable_versions.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    options = Column(JSON, default=dict)  # Generation options (engine, budgets, ...)
+    stats = Column(JSON, default=dict)
+    pending = Column(JSON, default=list)
+    class_names = Column(JSON, default=list)  # Every class at generation time, including empty ones
+    calendar = Column(JSON, default=dict)  # Days and periods the version was generated for
+
+    slots = relationship("TimetableSlot", back_populates="version", cascade="all, delete-orphan")
+
+    # Version lists and "latest" are per tenant
+    __table_args__ = (
+        Index("ix_timetable_versions_tenant_id", "tenant_id", "id"),
+    )
+
+class TimetableSlot(Base):
+    __tablename__ = "timetable_slots"
+
+    id = Column(Integer, primary_key=True)
+    version_id = Column(Integer, ForeignKey("timetable_versions.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Integer, nullable=False)  # Index into the version's calendar days
+    period = Column(Integer, nullable=False)
+    lesson_id = Column(Integer, nullable=False)
+    class_id = Column(Integer, nullable=False)
+    class_name = Column(String, nullable=False)
+    course_id = Column(Integer, nullable=False)
+    faculty_id = Column(Integer, nullable=False)
+    classroom_id = Column(Integer, nullable=True)
+    data = Column(JSON, nullable=False)  # Rendered cell as returned by the generator
+
+    version = relationship("TimetableVersion", back_populates="slots")
+
+    __table_args__ = (
+        Index("ix_timetable_slots_version_class", "version_id", "class_id"),
+        Index("ix_timetable_slots_version_faculty", "version_id", "faculty_id"),
+        Index("ix_timetable_slots_version_classroom", "version_id", "classroom_id"),
+    )
@@ -0,0 +1,58 @@
+"""Bulk import/export routes shared by the master data routers"""
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Literal, Optional, Type
+from ..database import get_db
+from ..services.bulk_io import BulkValidationError, bulk_insert, csv_lines, export_rows, parse_csv, validate_rows
+from .tenancy import get_tenant_id
+
+
+def add_bulk_routes(router: APIRouter, model, create_schema: Type[BaseModel], schema: Type[BaseModel],
+                    references: Optional[Dict[str, Any]] = None):
+    """Register POST /bulk (JSON array), POST /bulk/csv (upload) and GET /export on a router
+
+    Call before the router's ``/{id}`` routes so ``/export`` is not taken
+    for an id. ``references`` maps foreign-key fields to the models they
+    point at, checked in batch before inserting.
+    """
+    name = model.__tablename__
+
+    def insert_rows(db: Session, items: List[BaseModel], tenant_id: str) -> Dict[str, Any]:
+        try:
+            ids = bulk_insert(db, model, items, references, tenant_id)
+        except BulkValidationError as exc:
+            raise HTTPException(status_code=422, detail=exc.errors)
+        except IntegrityError as exc:
+            db.rollback()
+            raise HTTPException(status_code=409, detail=f"Bulk insert rejected: {exc.orig}")
+        return {"created": len(ids), "ids": ids}
+
+    @router.post("/bulk", status_code=201, name=f"bulk_create_{name}")
+    def bulk_create(items: List[create_schema], db: Session = Depends(get_db),
+                    tenant_id: str = Depends(get_tenant_id)):
+        return insert_rows(db, items, tenant_id)
+
+    @router.post("/bulk/csv", status_code=201, name=f"bulk_create_{name}_csv")
+    def bulk_create_csv(file: UploadFile = File(...), db: Session = Depends(get_db),
+                        tenant_id: str = Depends(get_tenant_id)):
+        content = file.file.read().decode("utf-8-sig")
+        try:
+            items = validate_rows(create_schema, parse_csv(content))
+        except BulkValidationError as exc:
+            raise HTTPException(status_code=422, detail=exc.errors)
+        return insert_rows(db, items, tenant_id)
+
+    @router.get("/export", response_model=List[schema], name=f"export_{name}")
+    def export(format: Literal["json", "csv"] = Query("json"), db: Session = Depends(get_db),
+               tenant_id: str = Depends(get_tenant_id)):
+        rows = export_rows(db, model, tenant_id)
+        if format == "csv":
+            return StreamingResponse(
+                csv_lines(model, rows),
+                media_type="text/csv",
+                headers={"Content-Disposition": f'attachment; filename="{name}.csv"'},
+            )
+        return rows
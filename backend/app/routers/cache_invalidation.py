@@ -0,0 +1,11 @@
+"""Router dependency clearing cached generation results after master data writes"""
+from fastapi import Depends, Request
+from ..services.result_cache import result_cache
+from .tenancy import get_tenant_id
+
+
+def invalidate_results_on_write(request: Request, tenant_id: str = Depends(get_tenant_id)):
+    """Drop the tenant's cached timetables once a non-GET request on the router has run"""
+    yield
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        result_cache.clear(tenant_id)
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models.calendar import SchoolCalendar
+from ..schemas.calendar_schema import Calendar as CalendarSchema, CalendarUpdate
+from .cache_invalidation import invalidate_results_on_write
+from .tenancy import get_tenant_id
+
+router = APIRouter(prefix="/calendar", tags=["calendar"], dependencies=[Depends(invalidate_results_on_write)])
+
+def tenant_calendar(db: Session, tenant_id: str):
+    return db.query(SchoolCalendar).filter(SchoolCalendar.tenant_id == tenant_id).order_by(SchoolCalendar.id).first()
+
+@router.get("/", response_model=CalendarSchema)
+def get_calendar(db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    """The tenant's school week used for generation; the default 5x8 week until one is stored"""
+    calendar = tenant_calendar(db, tenant_id)
+    return calendar or CalendarSchema()
+
+@router.put("/", response_model=CalendarSchema)
+def update_calendar(calendar: CalendarUpdate, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    if len(set(calendar.days)) != len(calendar.days):
+        raise HTTPException(status_code=400, detail="Days must be unique")
+    unknown = [day for day in calendar.day_periods if day not in calendar.days]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"day_periods for unknown day(s): {', '.join(unknown)}")
+    if any(not 1 <= count <= 24 for count in calendar.day_periods.values()):
+        raise HTTPException(status_code=400, detail="day_periods must be between 1 and 24")
+    longest = max([calendar.periods_per_day, *calendar.day_periods.values()])
+    if any(not 0 <= period < longest for period in calendar.breaks):
+        raise HTTPException(status_code=400, detail=f"Breaks must be periods between 0 and {longest - 1}")
+
+    db_calendar = tenant_calendar(db, tenant_id)
+    if not db_calendar:
+        db_calendar = SchoolCalendar(tenant_id=tenant_id)
+        db.add(db_calendar)
+    for key, value in calendar.dict().items():
+        setattr(db_calendar, key, value)
+    db.commit()
+    db.refresh(db_calendar)
+    return db_calendar
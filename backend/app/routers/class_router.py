@@ -1,34 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import get_db
 from ..models.class_model import Class
 from ..schemas.class_schema import Class as ClassSchema, ClassCreate, ClassUpdate
+from .bulk_routes import add_bulk_routes
+from .cache_invalidation import invalidate_results_on_write
+from .list_query import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, list_page
+from .tenancy import get_tenant_id
 
-router = APIRouter(prefix="/classes", tags=["classes"])
+router = APIRouter(prefix="/classes", tags=["classes"], dependencies=[Depends(invalidate_results_on_write)])
+
+add_bulk_routes(router, Class, ClassCreate, ClassSchema)
 
 @router.get("/", response_model=List[ClassSchema])
-def get_classes(db: Session = Depends(get_db)):
-    return db.query(Class).all()
+def get_classes(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    fields: Optional[str] = None,
+    name: Optional[str] = None,
+    division: Optional[str] = None,
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(get_tenant_id),
+):
+    return list_page(db, Class, response, limit, cursor, fields, tenant_id=tenant_id, name=name, division=division)
 
 @router.get("/{class_id}", response_model=ClassSchema)
-def get_class(class_id: int, db: Session = Depends(get_db)):
-    cls = db.query(Class).filter(Class.id == class_id).first()
+def get_class(class_id: int, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    cls = db.query(Class).filter(Class.id == class_id, Class.tenant_id == tenant_id).first()
     if not cls:
         raise HTTPException(status_code=404, detail="Class not found")
     return cls
 
 @router.post("/", response_model=ClassSchema)
-def create_class(cls: ClassCreate, db: Session = Depends(get_db)):
-    db_class = Class(**cls.dict())
+def create_class(cls: ClassCreate, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    db_class = Class(**cls.dict(), tenant_id=tenant_id)
     db.add(db_class)
     db.commit()
     db.refresh(db_class)
     return db_class
 
 @router.put("/{class_id}", response_model=ClassSchema)
-def update_class(class_id: int, cls: ClassUpdate, db: Session = Depends(get_db)):
-    db_class = db.query(Class).filter(Class.id == class_id).first()
+def update_class(class_id: int, cls: ClassUpdate, db: Session = Depends(get_db),
+                 tenant_id: str = Depends(get_tenant_id)):
+    db_class = db.query(Class).filter(Class.id == class_id, Class.tenant_id == tenant_id).first()
     if not db_class:
         raise HTTPException(status_code=404, detail="Class not found")
     
@@ -41,8 +57,8 @@ def update_class(class_id: int, cls: ClassUpdate, db: Session = Depends(get_db))
     return db_class
 
 @router.delete("/{class_id}")
-def delete_class(class_id: int, db: Session = Depends(get_db)):
-    db_class = db.query(Class).filter(Class.id == class_id).first()
+def delete_class(class_id: int, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    db_class = db.query(Class).filter(Class.id == class_id, Class.tenant_id == tenant_id).first()
     if not db_class:
         raise HTTPException(status_code=404, detail="Class not found")
     
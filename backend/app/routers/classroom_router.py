@@ -1,34 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import get_db
 from ..models.classroom import Classroom
 from ..schemas.classroom_schema import Classroom as ClassroomSchema, ClassroomCreate, ClassroomUpdate
+from .bulk_routes import add_bulk_routes
+from .cache_invalidation import invalidate_results_on_write
+from .list_query import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, list_page
+from .tenancy import get_tenant_id
 
-router = APIRouter(prefix="/classrooms", tags=["classrooms"])
+router = APIRouter(prefix="/classrooms", tags=["classrooms"], dependencies=[Depends(invalidate_results_on_write)])
+
+add_bulk_routes(router, Classroom, ClassroomCreate, ClassroomSchema)
 
 @router.get("/", response_model=List[ClassroomSchema])
-def get_classrooms(db: Session = Depends(get_db)):
-    return db.query(Classroom).all()
+def get_classrooms(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    fields: Optional[str] = None,
+    classroom_type: Optional[str] = None,
+    is_shared: Optional[bool] = None,
+    is_homeroom: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(get_tenant_id),
+):
+    return list_page(
+        db, Classroom, response, limit, cursor, fields, tenant_id=tenant_id,
+        classroom_type=classroom_type, is_shared=is_shared, is_homeroom=is_homeroom,
+    )
 
 @router.get("/{classroom_id}", response_model=ClassroomSchema)
-def get_classroom(classroom_id: int, db: Session = Depends(get_db)):
-    classroom = db.query(Classroom).filter(Classroom.id == classroom_id).first()
+def get_classroom(classroom_id: int, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    classroom = db.query(Classroom).filter(Classroom.id == classroom_id, Classroom.tenant_id == tenant_id).first()
     if not classroom:
         raise HTTPException(status_code=404, detail="Classroom not found")
     return classroom
 
 @router.post("/", response_model=ClassroomSchema)
-def create_classroom(classroom: ClassroomCreate, db: Session = Depends(get_db)):
-    db_classroom = Classroom(**classroom.dict())
+def create_classroom(classroom: ClassroomCreate, db: Session = Depends(get_db),
+                     tenant_id: str = Depends(get_tenant_id)):
+    db_classroom = Classroom(**classroom.dict(), tenant_id=tenant_id)
     db.add(db_classroom)
     db.commit()
     db.refresh(db_classroom)
     return db_classroom
 
 @router.put("/{classroom_id}", response_model=ClassroomSchema)
-def update_classroom(classroom_id: int, classroom: ClassroomUpdate, db: Session = Depends(get_db)):
-    db_classroom = db.query(Classroom).filter(Classroom.id == classroom_id).first()
+def update_classroom(classroom_id: int, classroom: ClassroomUpdate, db: Session = Depends(get_db),
+                     tenant_id: str = Depends(get_tenant_id)):
+    db_classroom = db.query(Classroom).filter(Classroom.id == classroom_id, Classroom.tenant_id == tenant_id).first()
     if not db_classroom:
         raise HTTPException(status_code=404, detail="Classroom not found")
     
@@ -41,8 +62,8 @@ def update_classroom(classroom_id: int, classroom: ClassroomUpdate, db: Session
     return db_classroom
 
 @router.delete("/{classroom_id}")
-def delete_classroom(classroom_id: int, db: Session = Depends(get_db)):
-    db_classroom = db.query(Classroom).filter(Classroom.id == classroom_id).first()
+def delete_classroom(classroom_id: int, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    db_classroom = db.query(Classroom).filter(Classroom.id == classroom_id, Classroom.tenant_id == tenant_id).first()
     if not db_classroom:
         raise HTTPException(status_code=404, detail="Classroom not found")
     
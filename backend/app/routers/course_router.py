@@ -1,34 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import get_db
 from ..models.course import Course
 from ..schemas.course_schema import Course as CourseSchema, CourseCreate, CourseUpdate
+from .bulk_routes import add_bulk_routes
+from .cache_invalidation import invalidate_results_on_write
+from .list_query import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, list_page
+from .tenancy import get_tenant_id
 
-router = APIRouter(prefix="/courses", tags=["courses"])
+router = APIRouter(prefix="/courses", tags=["courses"], dependencies=[Depends(invalidate_results_on_write)])
+
+add_bulk_routes(router, Course, CourseCreate, CourseSchema)
 
 @router.get("/", response_model=List[CourseSchema])
-def get_courses(db: Session = Depends(get_db)):
-    return db.query(Course).all()
+def get_courses(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    fields: Optional[str] = None,
+    title: Optional[str] = None,
+    abbreviation: Optional[str] = None,
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(get_tenant_id),
+):
+    return list_page(
+        db, Course, response, limit, cursor, fields,
+        tenant_id=tenant_id, title=title, abbreviation=abbreviation,
+    )
 
 @router.get("/{course_id}", response_model=CourseSchema)
-def get_course(course_id: int, db: Session = Depends(get_db)):
-    course = db.query(Course).filter(Course.id == course_id).first()
+def get_course(course_id: int, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    course = db.query(Course).filter(Course.id == course_id, Course.tenant_id == tenant_id).first()
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return course
 
 @router.post("/", response_model=CourseSchema)
-def create_course(course: CourseCreate, db: Session = Depends(get_db)):
-    db_course = Course(**course.dict())
+def create_course(course: CourseCreate, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    db_course = Course(**course.dict(), tenant_id=tenant_id)
     db.add(db_course)
     db.commit()
     db.refresh(db_course)
     return db_course
 
 @router.put("/{course_id}", response_model=CourseSchema)
-def update_course(course_id: int, course: CourseUpdate, db: Session = Depends(get_db)):
-    db_course = db.query(Course).filter(Course.id == course_id).first()
+def update_course(course_id: int, course: CourseUpdate, db: Session = Depends(get_db),
+                  tenant_id: str = Depends(get_tenant_id)):
+    db_course = db.query(Course).filter(Course.id == course_id, Course.tenant_id == tenant_id).first()
     if not db_course:
         raise HTTPException(status_code=404, detail="Course not found")
     
@@ -41,8 +60,8 @@ def update_course(course_id: int, course: CourseUpdate, db: Session = Depends(ge
     return db_course
 
 @router.delete("/{course_id}")
-def delete_course(course_id: int, db: Session = Depends(get_db)):
-    db_course = db.query(Course).filter(Course.id == course_id).first()
+def delete_course(course_id: int, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    db_course = db.query(Course).filter(Course.id == course_id, Course.tenant_id == tenant_id).first()
     if not db_course:
         raise HTTPException(status_code=404, detail="Course not found")
     
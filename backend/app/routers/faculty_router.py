@@ -1,34 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import get_db
 from ..models.faculty import Faculty
 from ..schemas.faculty_schema import Faculty as FacultySchema, FacultyCreate, FacultyUpdate
+from .bulk_routes import add_bulk_routes
+from .cache_invalidation import invalidate_results_on_write
+from .list_query import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, list_page
+from .tenancy import get_tenant_id
 
-router = APIRouter(prefix="/faculties", tags=["faculties"])
+router = APIRouter(prefix="/faculties", tags=["faculties"], dependencies=[Depends(invalidate_results_on_write)])
+
+add_bulk_routes(router, Faculty, FacultyCreate, FacultySchema)
 
 @router.get("/", response_model=List[FacultySchema])
-def get_faculties(db: Session = Depends(get_db)):
-    return db.query(Faculty).all()
+def get_faculties(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    fields: Optional[str] = None,
+    abbreviation: Optional[str] = None,
+    email: Optional[str] = None,
+    is_class_teacher: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(get_tenant_id),
+):
+    return list_page(
+        db, Faculty, response, limit, cursor, fields, tenant_id=tenant_id,
+        abbreviation=abbreviation, email=email, is_class_teacher=is_class_teacher,
+    )
 
 @router.get("/{faculty_id}", response_model=FacultySchema)
-def get_faculty(faculty_id: int, db: Session = Depends(get_db)):
-    faculty = db.query(Faculty).filter(Faculty.id == faculty_id).first()
+def get_faculty(faculty_id: int, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    faculty = db.query(Faculty).filter(Faculty.id == faculty_id, Faculty.tenant_id == tenant_id).first()
     if not faculty:
         raise HTTPException(status_code=404, detail="Faculty not found")
     return faculty
 
 @router.post("/", response_model=FacultySchema)
-def create_faculty(faculty: FacultyCreate, db: Session = Depends(get_db)):
-    db_faculty = Faculty(**faculty.dict())
+def create_faculty(faculty: FacultyCreate, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    db_faculty = Faculty(**faculty.dict(), tenant_id=tenant_id)
     db.add(db_faculty)
     db.commit()
     db.refresh(db_faculty)
     return db_faculty
 
 @router.put("/{faculty_id}", response_model=FacultySchema)
-def update_faculty(faculty_id: int, faculty: FacultyUpdate, db: Session = Depends(get_db)):
-    db_faculty = db.query(Faculty).filter(Faculty.id == faculty_id).first()
+def update_faculty(faculty_id: int, faculty: FacultyUpdate, db: Session = Depends(get_db),
+                   tenant_id: str = Depends(get_tenant_id)):
+    db_faculty = db.query(Faculty).filter(Faculty.id == faculty_id, Faculty.tenant_id == tenant_id).first()
     if not db_faculty:
         raise HTTPException(status_code=404, detail="Faculty not found")
     
@@ -41,8 +61,8 @@ def update_faculty(faculty_id: int, faculty: FacultyUpdate, db: Session = Depend
     return db_faculty
 
 @router.delete("/{faculty_id}")
-def delete_faculty(faculty_id: int, db: Session = Depends(get_db)):
-    db_faculty = db.query(Faculty).filter(Faculty.id == faculty_id).first()
+def delete_faculty(faculty_id: int, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    db_faculty = db.query(Faculty).filter(Faculty.id == faculty_id, Faculty.tenant_id == tenant_id).first()
     if not db_faculty:
         raise HTTPException(status_code=404, detail="Faculty not found")
     
@@ -1,36 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import get_db
 from ..models.lesson import Lesson
+from ..models.course import Course
+from ..models.class_model import Class
+from ..models.faculty import Faculty
 from ..schemas.lesson_schema import Lesson as LessonSchema, LessonCreate, LessonUpdate
+from ..services.bulk_io import BulkValidationError, check_references
+from .bulk_routes import add_bulk_routes
+from .cache_invalidation import invalidate_results_on_write
+from .list_query import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, list_page
+from .tenancy import get_tenant_id
 
-router = APIRouter(prefix="/lessons", tags=["lessons"])
+router = APIRouter(prefix="/lessons", tags=["lessons"], dependencies=[Depends(invalidate_results_on_write)])
+
+# Rows a lesson points at, which must belong to the lesson's tenant
+REFERENCES = {"course_id": Course, "class_id": Class, "faculty_id": Faculty, "shared_faculty_ids": Faculty}
+
+add_bulk_routes(router, Lesson, LessonCreate, LessonSchema, references=REFERENCES)
+
+def check_lesson_references(db: Session, lesson, tenant_id: str):
+    """Reject a lesson (or lesson update) that references another tenant's rows or missing ones"""
+    try:
+        check_references(db, [lesson], REFERENCES, tenant_id)
+    except BulkValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors[0]["errors"])
 
 @router.get("/", response_model=List[LessonSchema])
-def get_lessons(db: Session = Depends(get_db)):
-    return db.query(Lesson).all()
+def get_lessons(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    fields: Optional[str] = None,
+    course_id: Optional[int] = None,
+    class_id: Optional[int] = None,
+    faculty_id: Optional[int] = None,
+    group: Optional[str] = None,
+    classroom_type: Optional[str] = None,
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(get_tenant_id),
+):
+    return list_page(
+        db, Lesson, response, limit, cursor, fields, tenant_id=tenant_id,
+        course_id=course_id, class_id=class_id, faculty_id=faculty_id, group=group, classroom_type=classroom_type,
+    )
 
 @router.get("/{lesson_id}", response_model=LessonSchema)
-def get_lesson(lesson_id: int, db: Session = Depends(get_db)):
-    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+def get_lesson(lesson_id: int, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    lesson = db.query(Lesson).filter(Lesson.id == lesson_id, Lesson.tenant_id == tenant_id).first()
     if not lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
     return lesson
 
 @router.post("/", response_model=LessonSchema)
-def create_lesson(lesson: LessonCreate, db: Session = Depends(get_db)):
-    db_lesson = Lesson(**lesson.dict())
+def create_lesson(lesson: LessonCreate, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    check_lesson_references(db, lesson, tenant_id)
+    db_lesson = Lesson(**lesson.dict(), tenant_id=tenant_id)
     db.add(db_lesson)
     db.commit()
     db.refresh(db_lesson)
     return db_lesson
 
 @router.put("/{lesson_id}", response_model=LessonSchema)
-def update_lesson(lesson_id: int, lesson: LessonUpdate, db: Session = Depends(get_db)):
-    db_lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+def update_lesson(lesson_id: int, lesson: LessonUpdate, db: Session = Depends(get_db),
+                  tenant_id: str = Depends(get_tenant_id)):
+    db_lesson = db.query(Lesson).filter(Lesson.id == lesson_id, Lesson.tenant_id == tenant_id).first()
     if not db_lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
+    check_lesson_references(db, lesson, tenant_id)
     
     update_data = lesson.dict(exclude_unset=True)
     for key, value in update_data.items():
@@ -41,8 +79,8 @@ def update_lesson(lesson_id: int, lesson: LessonUpdate, db: Session = Depends(ge
     return db_lesson
 
 @router.delete("/{lesson_id}")
-def delete_lesson(lesson_id: int, db: Session = Depends(get_db)):
-    db_lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+def delete_lesson(lesson_id: int, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    db_lesson = db.query(Lesson).filter(Lesson.id == lesson_id, Lesson.tenant_id == tenant_id).first()
     if not db_lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
     
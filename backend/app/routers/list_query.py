@@ -0,0 +1,52 @@
+"""Cursor pagination, filtering and field projection for the master data list endpoints
+
+Pages are ordered by id and the cursor is the last id of the previous
+page, so each page is one indexed range scan however deep the client
+goes. The next cursor is sent in the ``X-Next-Cursor`` header, leaving
+the response body a plain list as before.
+"""
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from typing import Any, Optional
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def list_page(db: Session, model, response: Response, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[int] = None,
+              fields: Optional[str] = None, **filters: Any):
+    """One page of ``model`` rows matching the non-None ``filters``
+
+    ``fields`` is a comma-separated column list; when given only those
+    columns (plus ``id``) are read and returned, bypassing the response
+    model.
+    """
+    columns = {column.key: column for column in model.__table__.columns}
+    selected = None
+    if fields:
+        selected = ["id"] + [name.strip() for name in fields.split(",") if name.strip() and name.strip() != "id"]
+        unknown = [name for name in selected if name not in columns]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+        query = db.query(*[getattr(model, name) for name in selected])
+    else:
+        query = db.query(model)
+
+    for name, value in filters.items():
+        if value is not None:
+            query = query.filter(getattr(model, name) == value)
+    if cursor is not None:
+        query = query.filter(model.id > cursor)
+    rows = query.order_by(model.id).limit(limit + 1).all()
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
+
+    if selected is not None:
+        return JSONResponse([dict(zip(selected, row)) for row in rows], headers=headers)
+    response.headers.update(headers)
+    return rows
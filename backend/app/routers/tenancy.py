@@ -0,0 +1,27 @@
+"""Tenant of a request, taken from the X-Tenant-ID header
+
+A tenant is one school, or one term of a school, sharing the deployment
+with others. Every master data row, calendar and timetable version
+belongs to one tenant, and every route reads and writes only the rows of
+the request's tenant. Requests without the header use the default
+tenant, so single-school clients need no changes.
+"""
+from fastapi import Header, HTTPException
+from typing import Optional
+import re
+from ..database import DEFAULT_TENANT
+
+TENANT_HEADER = "X-Tenant-ID"
+# Ids are also used in cache file names, so keep them to a safe alphabet
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+
+def get_tenant_id(x_tenant_id: Optional[str] = Header(None)) -> str:
+    if x_tenant_id is None:
+        return DEFAULT_TENANT
+    if not TENANT_ID_PATTERN.match(x_tenant_id):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid {TENANT_HEADER}: use up to 64 letters, digits, '_', '.' or '-'",
+        )
+    return x_tenant_id
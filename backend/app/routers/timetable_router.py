@@ -1,13 +1,192 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
+from typing import List, Optional
 from ..database import get_db
-from ..schemas.timetable_schema import TimetableResponse
-from ..services.timetable_generator import generate_timetable
+from ..models.class_model import Class
+from ..models.classroom import Classroom
+from ..models.faculty import Faculty
+from ..models.timetable import TimetableVersion, TimetableSlot
+from ..schemas.timetable_schema import (
+    TimetableFormat,
+    TimetableEntityView,
+    TimetableGenerate,
+    TimetableJob,
+    TimetableReschedule,
+    TimetableResponse,
+    TimetableVersion as TimetableVersionSchema,
+)
+from ..services.timetable_store import (
+    generate_and_store,
+    latest_version,
+    load_class_timetable,
+    load_entity_timetable,
+    load_timetable,
+    reschedule_and_store,
+)
+from ..services.job_manager import job_manager, COMPLETED
+from ..services.generation_metrics import metrics_registry
+from ..services.result_cache import result_cache
+from ..services.timetable_encoding import compact_timetable, ndjson_lines
+from .tenancy import get_tenant_id
 
 router = APIRouter(prefix="/timetable", tags=["timetable"])
 
+def render_timetable(result: dict, format: TimetableFormat):
+    """Return a timetable result in the requested encoding"""
+    if format == "compact":
+        return JSONResponse(compact_timetable(result))
+    if format == "ndjson":
+        return StreamingResponse(ndjson_lines(result), media_type="application/x-ndjson")
+    return result
+
 @router.post("/generate", response_model=TimetableResponse)
-def generate_timetable_endpoint(db: Session = Depends(get_db)):
-    """Generate timetable for all classes"""
-    result = generate_timetable(db)
+def generate_timetable_endpoint(options: Optional[TimetableGenerate] = None, format: TimetableFormat = Query("full"),
+                                db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    """Generate timetable for all classes of the tenant"""
+    options = options or TimetableGenerate()
+    result = generate_and_store(db, options.dict(exclude_none=True), tenant_id=tenant_id)
+    metrics_registry.record(result, tenant_id)
+    return render_timetable(result, format)
+
+@router.get("/metrics")
+def get_generation_metrics(tenant_id: str = Depends(get_tenant_id)):
+    """Totals and recent history of the tenant's instrumented generation runs in this server"""
+    return {**metrics_registry.snapshot(tenant_id), "result_cache": result_cache.info(tenant_id)}
+
+@router.post("/jobs", response_model=TimetableJob, status_code=202)
+def create_generation_job(options: Optional[TimetableGenerate] = None, tenant_id: str = Depends(get_tenant_id)):
+    """Start generating the tenant's timetable in the background"""
+    options = options or TimetableGenerate()
+    job = job_manager.submit(options.dict(exclude_none=True), tenant_id)
+    return job.to_dict()
+
+@router.get("/jobs", response_model=List[TimetableJob])
+def get_generation_jobs(tenant_id: str = Depends(get_tenant_id)):
+    return [job.to_dict() for job in job_manager.all(tenant_id)]
+
+@router.get("/jobs/{job_id}", response_model=TimetableJob)
+def get_generation_job(job_id: str, tenant_id: str = Depends(get_tenant_id)):
+    job = job_manager.get(job_id, tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}/result", response_model=TimetableResponse)
+def get_generation_job_result(job_id: str, format: TimetableFormat = Query("full"),
+                              tenant_id: str = Depends(get_tenant_id)):
+    job = job_manager.get(job_id, tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return render_timetable(job.result, format)
+
+@router.post("/jobs/{job_id}/cancel", response_model=TimetableJob)
+def cancel_generation_job(job_id: str, tenant_id: str = Depends(get_tenant_id)):
+    job = job_manager.cancel(job_id, tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+def get_version_or_404(version_id: int, db: Session, tenant_id: str) -> TimetableVersion:
+    version = (
+        db.query(TimetableVersion)
+        .filter(TimetableVersion.id == version_id, TimetableVersion.tenant_id == tenant_id)
+        .first()
+    )
+    if not version:
+        raise HTTPException(status_code=404, detail="Timetable version not found")
+    return version
+
+@router.get("/versions", response_model=List[TimetableVersionSchema])
+def get_versions(db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    return (
+        db.query(TimetableVersion)
+        .filter(TimetableVersion.tenant_id == tenant_id)
+        .order_by(TimetableVersion.id.desc())
+        .all()
+    )
+
+@router.get("/versions/latest", response_model=TimetableResponse)
+def get_latest_version(format: TimetableFormat = Query("full"), db: Session = Depends(get_db),
+                       tenant_id: str = Depends(get_tenant_id)):
+    return render_timetable(load_timetable(db, get_version_or_latest(None, db, tenant_id)), format)
+
+@router.get("/versions/{version_id}", response_model=TimetableResponse)
+def get_version(version_id: int, format: TimetableFormat = Query("full"), db: Session = Depends(get_db),
+                tenant_id: str = Depends(get_tenant_id)):
+    return render_timetable(load_timetable(db, get_version_or_404(version_id, db, tenant_id)), format)
+
+@router.get("/versions/{version_id}/classes/{class_id}", response_model=TimetableResponse)
+def get_class_version(version_id: int, class_id: int, format: TimetableFormat = Query("full"),
+                      db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    version = get_version_or_404(version_id, db, tenant_id)
+    cls = db.query(Class).filter(Class.id == class_id, Class.tenant_id == tenant_id).first()
+    if not cls:
+        raise HTTPException(status_code=404, detail="Class not found")
+    return render_timetable(load_class_timetable(db, version, cls), format)
+
+@router.post("/versions/{version_id}/reschedule", response_model=TimetableResponse)
+def reschedule_version(version_id: int, changes: Optional[TimetableReschedule] = None,
+                       format: TimetableFormat = Query("full"), db: Session = Depends(get_db),
+                       tenant_id: str = Depends(get_tenant_id)):
+    """Repair a stored timetable after edits, moving only the affected periods"""
+    version = get_version_or_404(version_id, db, tenant_id)
+    changes = changes or TimetableReschedule()
+    result = reschedule_and_store(db, version, changes.dict(exclude_none=True))
+    metrics_registry.record(result, tenant_id)
+    return render_timetable(result, format)
+
+@router.delete("/versions/{version_id}")
+def delete_version(version_id: int, db: Session = Depends(get_db), tenant_id: str = Depends(get_tenant_id)):
+    version = get_version_or_404(version_id, db, tenant_id)
+    db.query(TimetableSlot).filter(TimetableSlot.version_id == version.id).delete(synchronize_session=False)
+    # Versions rescheduled from this one keep their slots but lose their parent
+    db.query(TimetableVersion).filter(TimetableVersion.parent_id == version.id).update(
+        {TimetableVersion.parent_id: None}, synchronize_session=False
+    )
+    db.delete(version)
+    db.commit()
+    return {"message": "Timetable version deleted successfully"}
+
+def get_version_or_latest(version_id: Optional[int], db: Session, tenant_id: str) -> TimetableVersion:
+    if version_id is not None:
+        return get_version_or_404(version_id, db, tenant_id)
+    version = latest_version(db, tenant_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="No timetable has been saved yet")
+    return version
+
+@router.get("/faculty/{faculty_id}", response_model=TimetableEntityView)
+def get_faculty_timetable(faculty_id: int, version_id: Optional[int] = None, db: Session = Depends(get_db),
+                          tenant_id: str = Depends(get_tenant_id)):
+    """A faculty's week in a stored version (the latest by default)"""
+    faculty = db.query(Faculty).filter(Faculty.id == faculty_id, Faculty.tenant_id == tenant_id).first()
+    if not faculty:
+        raise HTTPException(status_code=404, detail="Faculty not found")
+    version = get_version_or_latest(version_id, db, tenant_id)
+    result = load_entity_timetable(db, version, TimetableSlot.faculty_id, faculty_id)
+    result["entity"] = {
+        "id": faculty.id,
+        "name": f"{faculty.first_name} {faculty.last_name}",
+        "abbreviation": faculty.abbreviation,
+    }
+    return result
+
+@router.get("/classroom/{classroom_id}", response_model=TimetableEntityView)
+def get_classroom_timetable(classroom_id: int, version_id: Optional[int] = None, db: Session = Depends(get_db),
+                            tenant_id: str = Depends(get_tenant_id)):
+    """A classroom's week in a stored version (the latest by default)"""
+    classroom = db.query(Classroom).filter(Classroom.id == classroom_id, Classroom.tenant_id == tenant_id).first()
+    if not classroom:
+        raise HTTPException(status_code=404, detail="Classroom not found")
+    version = get_version_or_latest(version_id, db, tenant_id)
+    result = load_entity_timetable(db, version, TimetableSlot.classroom_id, classroom_id)
+    result["entity"] = {
+        "id": classroom.id,
+        "name": classroom.name,
+        "abbreviation": classroom.abbreviation,
+        "classroom_type": classroom.classroom_type,
+    }
     return result
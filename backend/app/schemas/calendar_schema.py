@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+class CalendarBase(BaseModel):
+    name: Optional[str] = "Default"
+    days: List[str] = Field(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"], min_length=1)
+    periods_per_day: int = Field(8, ge=1, le=24)
+    day_periods: Dict[str, int] = {}  # period count of days that differ from periods_per_day
+    breaks: List[int] = []  # 0-based periods never taught
+
+class CalendarUpdate(CalendarBase):
+    pass
+
+class Calendar(CalendarBase):
+    id: Optional[int] = None  # None until a calendar is stored; the default week applies
+
+    class Config:
+        from_attributes = True
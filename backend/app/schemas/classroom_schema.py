@@ -5,6 +5,7 @@ class ClassroomBase(BaseModel):
     name: str
     abbreviation: str
     color: Optional[str] = "#10B981"
+    classroom_type: Optional[str] = "regular"
     is_homeroom: Optional[bool] = False
     is_shared: Optional[bool] = True
     requires_supervision: Optional[bool] = False
@@ -17,6 +18,7 @@ class ClassroomUpdate(BaseModel):
     name: Optional[str] = None
     abbreviation: Optional[str] = None
     color: Optional[str] = None
+    classroom_type: Optional[str] = None
     is_homeroom: Optional[bool] = None
     is_shared: Optional[bool] = None
     requires_supervision: Optional[bool] = None
@@ -1,19 +1,90 @@
-from pydantic import BaseModel
-from typing import Dict, List, Any
+from pydantic import BaseModel, Field, NonNegativeFloat
+from typing import Dict, List, Any, Literal, Optional
+from datetime import datetime
+import os
 
 class TimetableSlot(BaseModel):
     lesson_id: int
+    course_id: Optional[int] = None
+    faculty_id: Optional[int] = None
+    shared_faculty_ids: List[int] = []
     course_name: str
     course_abbr: str
     faculty_name: str
     faculty_abbr: str
     classroom: str
+    classroom_id: Optional[int] = None
     color: str
 
+# Response encodings: full nested cells, dictionary-encoded, or one NDJSON line per class
+TimetableFormat = Literal["full", "compact", "ndjson"]
+
+# Soft constraints a request may weight, see services.scoring
+SoftConstraint = Literal["pending", "faculty_gap", "cluster", "day_load", "late_heavy", "faculty_days"]
+
+# Most processes one request may use for its seeded runs
+MAX_RUN_WORKERS = os.cpu_count() or 1
+
 class TimetableGenerate(BaseModel):
-    pass  # Can add filters/options later
+    engine: Literal["greedy", "backtracking"] = "greedy"
+    max_nodes: Optional[int] = Field(None, gt=0, le=10_000_000)  # backtracking search budget
+    time_limit: Optional[float] = Field(None, gt=0, le=60)  # seconds, backtracking only
+    optimize: bool = False  # run the local-search improvement phase
+    optimize_time_limit: Optional[float] = Field(None, gt=0, le=60)  # seconds
+    optimize_iterations: Optional[int] = Field(None, gt=0, le=10_000_000)  # fixed budget instead, reproducible with seed
+    runs: Optional[int] = Field(None, ge=1, le=64)  # seeded runs, best result kept
+    workers: Optional[int] = Field(None, ge=1, le=MAX_RUN_WORKERS)  # processes for those runs
+    score: Optional[Literal["pending", "quality"]] = None  # how runs are ranked
+    weights: Optional[Dict[SoftConstraint, NonNegativeFloat]] = None  # overrides of the default soft-constraint weights
+    heavy_course_ids: Optional[List[int]] = None  # courses penalized in the second half of the day
+    seed: Optional[int] = Field(None, ge=0)  # reproduces a run; echoed in stats.seed
+    instrument: bool = False  # report counters and phase timings in stats.metrics
+    save: bool = True  # store the result as a new timetable version
+    label: Optional[str] = None  # version label when saved
+
+class TimetableReschedule(BaseModel):
+    lesson_ids: List[int] = []  # edited lessons whose periods are re-placed
+    max_moves: int = Field(50, ge=0)  # other periods that may be moved to make room
+    optimize: bool = False
+    optimize_time_limit: Optional[float] = Field(None, gt=0, le=60)
+    optimize_iterations: Optional[int] = Field(None, gt=0, le=10_000_000)
+    weights: Optional[Dict[SoftConstraint, NonNegativeFloat]] = None
+    heavy_course_ids: Optional[List[int]] = None
+    seed: Optional[int] = Field(None, ge=0)
+    instrument: bool = False
+    save: bool = True
+    label: Optional[str] = None
 
 class TimetableResponse(BaseModel):
     timetable: Dict[str, Dict[str, List[Any]]]  # {class_name: {day: [slots]}}
     pending: List[Dict[str, Any]]
     stats: Dict[str, Any]
+    calendar: Optional[Dict[str, Any]] = None  # days, periods_per_day, day_periods and breaks of the week
+    version_id: Optional[int] = None  # set when the result was saved
+
+class TimetableEntityView(BaseModel):
+    version_id: int
+    entity: Dict[str, Any]  # the faculty or classroom
+    timetable: Dict[str, List[Any]]  # {day: [slots]}, each slot with its class_name
+    total_periods: int
+
+class TimetableVersion(BaseModel):
+    id: int
+    label: Optional[str] = None
+    parent_id: Optional[int] = None
+    created_at: datetime
+    options: Dict[str, Any]
+    stats: Dict[str, Any]
+
+    class Config:
+        from_attributes = True
+
+class TimetableJob(BaseModel):
+    id: str
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    options: Dict[str, Any]
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: Dict[str, Any]  # phase, lessons_placed, pending, elapsed_ms
+    error: Optional[str] = None
@@ -0,0 +1,129 @@
+"""Bulk import and export of master data
+
+Rows are validated as a batch against the entity's create schema and, only
+when every row is valid, inserted in one transaction with a single
+executemany INSERT. CSV cells holding JSON columns (lists, objects) are
+written and read as JSON text. Rows are inserted into, checked against
+and exported from one tenant, and the tenant column itself is never
+exported.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
+import csv
+import io
+import json
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from ..database import DEFAULT_TENANT
+
+
+class BulkValidationError(Exception):
+    """Raised with per-row errors when any row of a batch is invalid"""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors
+
+
+def parse_csv(content: str) -> List[Dict[str, Any]]:
+    """Rows of a CSV with a header line; empty cells are left out so defaults apply"""
+    rows = []
+    for record in csv.DictReader(io.StringIO(content)):
+        row = {}
+        for key, value in record.items():
+            if key is None or value is None:
+                continue
+            value = value.strip()
+            if value == "":
+                continue
+            if value[0] in "[{":
+                try:
+                    value = json.loads(value)
+                except json.JSONDecodeError:
+                    pass
+            row[key.strip()] = value
+        rows.append(row)
+    return rows
+
+
+def validate_rows(schema: Type[BaseModel], rows: Iterable[Dict[str, Any]]) -> List[BaseModel]:
+    """Validate every row, raising BulkValidationError listing all failures"""
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        try:
+            valid.append(schema(**row))
+        except ValidationError as exc:
+            errors.append({"row": index, "errors": exc.errors(include_url=False, include_context=False)})
+        except TypeError as exc:
+            errors.append({"row": index, "errors": [{"msg": str(exc)}]})
+    if errors:
+        raise BulkValidationError(errors)
+    return valid
+
+
+def data_columns(model) -> List[str]:
+    """Column names of a table, without the tenant column"""
+    return [column.key for column in model.__table__.columns if column.key != "tenant_id"]
+
+
+def _referenced_ids(value: Any) -> List[Any]:
+    """Ids held by a reference field: a single id, a list of ids, or None"""
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def check_references(db: Session, items: List[BaseModel], references: Optional[Dict[str, Any]],
+                     tenant_id: str = DEFAULT_TENANT):
+    """Verify foreign keys (single ids or id lists) point into the tenant, with one query per referenced field"""
+    errors = []
+    for field, model in (references or {}).items():
+        wanted = {value for item in items for value in _referenced_ids(getattr(item, field, None))}
+        if not wanted:
+            continue
+        found = {row[0] for row in db.query(model.id).filter(model.id.in_(wanted), model.tenant_id == tenant_id)}
+        for index, item in enumerate(items):
+            for value in _referenced_ids(getattr(item, field, None)):
+                if value not in found:
+                    message = f"{model.__name__} {value} not found"
+                    errors.append({"row": index, "errors": [{"loc": [field], "msg": message}]})
+    if errors:
+        errors.sort(key=lambda error: error["row"])
+        raise BulkValidationError(errors)
+
+
+def bulk_insert(db: Session, model, items: List[BaseModel], references: Optional[Dict[str, Any]] = None,
+                tenant_id: str = DEFAULT_TENANT) -> List[int]:
+    """Insert validated rows into a tenant in a single transaction and return their new ids"""
+    check_references(db, items, references, tenant_id)
+    if not items:
+        return []
+    result = db.execute(insert(model).returning(model.id), [dict(item.dict(), tenant_id=tenant_id) for item in items])
+    ids = [row[0] for row in result]
+    db.commit()
+    return ids
+
+
+def export_rows(db: Session, model, tenant_id: str = DEFAULT_TENANT) -> List[Dict[str, Any]]:
+    """Every row of a tenant's table as column dicts, in id order"""
+    columns = data_columns(model)
+    query = db.query(*[getattr(model, key) for key in columns]).filter(model.tenant_id == tenant_id).order_by(model.id)
+    return [dict(zip(columns, row)) for row in query]
+
+
+def csv_lines(model, rows: List[Dict[str, Any]]) -> Iterator[str]:
+    """Stream rows as CSV, JSON-encoding list and object cells"""
+    columns = data_columns(model)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([
+            json.dumps(row[key]) if isinstance(row[key], (list, dict)) else row[key]
+            for key in columns
+        ])
+        if buffer.tell() > 65536:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
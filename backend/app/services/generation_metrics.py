@@ -0,0 +1,146 @@
+"""Optional instrumentation of timetable generation
+
+A GenerationMetrics instance is attached to a TimetableGenerator only when
+instrumentation is requested; the generator's hot paths check for it with
+a single ``is not None`` test, so disabled runs pay next to nothing.
+
+Slot-mask calls are attributed per candidate start slot: a start is
+rejected for the first constraint, in REJECTION_REASONS order, that rules
+it out. Finished runs are also recorded in ``metrics_registry``, per
+tenant, for the /timetable/metrics endpoint.
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, Optional, Tuple
+import os
+import threading
+import time
+from .slot_masks import Calendar
+from ..database import DEFAULT_TENANT
+
+# Instrument every run, not only those that ask for it
+INSTRUMENT_ALL = os.environ.get("TIMETABLE_METRICS", "").lower() in ("1", "true", "yes")
+
+# Number of instrumented runs whose metrics the registry keeps
+RECENT_RUNS = 20
+
+REJECTION_REASONS = (
+    "day_end", "class_busy", "same_day", "faculty_busy", "time_off", "class_unavailable", "course_unavailable",
+    "max_per_day", "no_room",
+)
+
+
+class GenerationMetrics:
+    def __init__(self):
+        self.counters: Dict[str, int] = {
+            "mask_calls": 0,
+            "slots_evaluated": 0,
+            "slots_valid": 0,
+            "assignments": 0,
+            "unassignments": 0,
+            "pending": 0,
+        }
+        self.rejections: Dict[str, int] = dict.fromkeys(REJECTION_REASONS, 0)
+        self.phase_ms: Dict[str, float] = {}
+        self._phase: Optional[str] = None
+        self._phase_started = 0.0
+
+    def start_phase(self, phase: str):
+        """Close the running phase's timer and start one for ``phase``"""
+        now = time.perf_counter()
+        if self._phase is not None:
+            self.phase_ms[self._phase] = round(
+                self.phase_ms.get(self._phase, 0.0) + (now - self._phase_started) * 1000, 3
+            )
+        self._phase = None if phase == "done" else phase
+        self._phase_started = now
+
+    def add_phase_ms(self, phase: str, ms: float):
+        """Count time spent outside the generator, such as loading a snapshot, towards ``phase``"""
+        self.phase_ms[phase] = round(self.phase_ms.get(phase, 0.0) + ms, 3)
+
+    def record_mask(self, calendar: Calendar, length: int, blockers: Iterable[Tuple[str, int]],
+                    room_starts: Optional[int]):
+        """Attribute every start slot of one _valid_slot_mask call to a rejection reason or to valid
+
+        Only slots the calendar teaches in are evaluated; ``day_end`` counts
+        starts whose block would run past the end of the day or into a break.
+        """
+        remaining = calendar.block_start_masks[length]
+        slots = bin(calendar.full_week_mask).count("1")
+        self.counters["mask_calls"] += 1
+        self.counters["slots_evaluated"] += slots
+        self.rejections["day_end"] += slots - bin(remaining).count("1")
+        for reason, blocked in blockers:
+            kept = remaining & calendar.block_starts(calendar.full_week_mask & ~blocked, length)
+            self.rejections[reason] += bin(remaining & ~kept).count("1")
+            remaining = kept
+        if room_starts is not None:
+            kept = remaining & room_starts
+            self.rejections["no_room"] += bin(remaining & ~kept).count("1")
+            remaining = kept
+        self.counters["slots_valid"] += bin(remaining).count("1")
+
+    def count(self, counter: str, amount: int = 1):
+        self.counters[counter] += amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "counters": dict(self.counters),
+            "rejections": dict(self.rejections),
+            "phase_ms": dict(self.phase_ms),
+        }
+
+
+class TenantMetrics:
+    """Totals and recent history of one tenant's instrumented runs"""
+
+    def __init__(self, recent: int):
+        self.runs = 0
+        self.totals: Dict[str, Dict[str, float]] = {"counters": {}, "rejections": {}, "phase_ms": {}}
+        self.recent = deque(maxlen=recent)
+
+
+class MetricsRegistry:
+    """Process-wide totals and recent history of instrumented runs, kept per tenant"""
+
+    def __init__(self, recent: int = RECENT_RUNS):
+        self._lock = threading.Lock()
+        self.recent_runs = recent
+        self._tenants: Dict[str, TenantMetrics] = {}
+
+    def record(self, result: Dict[str, Any], tenant_id: str = DEFAULT_TENANT):
+        """Add the metrics of a tenant's generator result, if it was instrumented and not served from cache"""
+        stats = result.get("stats", {})
+        metrics = stats.get("metrics")
+        if not metrics or stats.get("cached"):
+            return
+        with self._lock:
+            tenant = self._tenants.get(tenant_id)
+            if tenant is None:
+                tenant = self._tenants[tenant_id] = TenantMetrics(self.recent_runs)
+            tenant.runs += 1
+            for group, values in metrics.items():
+                totals = tenant.totals.setdefault(group, {})
+                for key, value in values.items():
+                    totals[key] = round(totals.get(key, 0) + value, 3)
+            tenant.recent.append({
+                "engine": stats.get("engine"),
+                "seed": stats.get("seed"),
+                "total_pending": stats.get("total_pending"),
+                "recorded_at": time.time(),
+                **metrics,
+            })
+
+    def snapshot(self, tenant_id: str = DEFAULT_TENANT) -> Dict[str, Any]:
+        """Totals and recent runs of one tenant"""
+        with self._lock:
+            tenant = self._tenants.get(tenant_id) or TenantMetrics(self.recent_runs)
+            return {
+                "instrument_all": INSTRUMENT_ALL,
+                "runs": tenant.runs,
+                "totals": {group: dict(values) for group, values in tenant.totals.items()},
+                "recent": list(tenant.recent),
+            }
+
+
+metrics_registry = MetricsRegistry()
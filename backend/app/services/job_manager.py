@@ -0,0 +1,217 @@
+"""Background timetable generation jobs
+
+Jobs run generate_and_store in a process pool so the API event loop and
+request workers stay free. Each job gets a Manager-backed dict that the
+worker writes progress into and the API reads from; setting
+``cancel_requested`` in it makes the worker abort at its next progress
+report. Finished results are kept in memory for later retrieval, up to
+MAX_FINISHED_JOBS jobs.
+
+Every tenant shares the same pool, so a deployment serving many schools
+needs only MAX_WORKERS processes, and each job loads just its tenant's
+data. At most MAX_JOBS_PER_TENANT jobs of one tenant run at a time;
+further jobs of that tenant wait in its own queue, so a tenant
+submitting many jobs cannot hold every worker while others wait.
+"""
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+import multiprocessing
+import os
+import threading
+import uuid
+from ..database import DEFAULT_TENANT
+from .timetable_generator import GenerationCancelled
+from .timetable_store import generate_and_store
+from .generation_metrics import metrics_registry
+
+MAX_WORKERS = int(os.environ.get("TIMETABLE_JOB_WORKERS", os.cpu_count() or 1))
+MAX_FINISHED_JOBS = int(os.environ.get("TIMETABLE_JOB_RETENTION", 100))
+# Half the pool by default, so one busy tenant always leaves workers for the others
+MAX_JOBS_PER_TENANT = int(os.environ.get("TIMETABLE_JOBS_PER_TENANT", max(1, MAX_WORKERS // 2)))
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+def _init_worker():
+    """Drop connections inherited from the parent so each worker opens its own"""
+    from ..database import engine
+    engine.dispose(close=False)
+
+
+def _run_job(options: Dict[str, Any], progress, tenant_id: str) -> Dict[str, Any]:
+    """Process-pool entry point: generate a tenant's timetable, reporting into progress"""
+    from ..database import SessionLocal
+
+    def report(snapshot: Dict[str, Any]):
+        progress.update(snapshot)
+        if progress.get("cancel_requested"):
+            raise GenerationCancelled()
+
+    # Cancelled while being handed to the pool
+    if progress.get("cancel_requested"):
+        raise GenerationCancelled()
+    progress["state"] = RUNNING
+    progress["started_at"] = datetime.utcnow().isoformat()
+    db = SessionLocal()
+    try:
+        return generate_and_store(db, options, progress_callback=report, tenant_id=tenant_id)
+    finally:
+        db.close()
+
+
+class Job:
+    def __init__(self, options: Dict[str, Any], progress, tenant_id: str = DEFAULT_TENANT):
+        self.id = uuid.uuid4().hex
+        self.tenant_id = tenant_id
+        self.options = options
+        self.progress = progress
+        self.status = QUEUED
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+        self._final_progress: Dict[str, Any] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        progress = dict(self.progress) if self.status not in FINISHED_STATES else self._final_progress
+        status = self.status
+        if status == QUEUED and progress.get("state") == RUNNING:
+            status = RUNNING
+        return {
+            "id": self.id,
+            "status": status,
+            "options": self.options,
+            "created_at": self.created_at,
+            "started_at": progress.get("started_at"),
+            "finished_at": self.finished_at,
+            "progress": {k: v for k, v in progress.items() if k not in ("state", "started_at", "cancel_requested")},
+            "error": self.error,
+        }
+
+    def _finish(self, status: str):
+        # Manager proxies die with the manager, so keep a plain copy
+        try:
+            self._final_progress = dict(self.progress)
+        except Exception:
+            self._final_progress = {}
+        self.status = status
+        self.finished_at = datetime.utcnow()
+
+
+class JobManager:
+    def __init__(self, max_workers: int = MAX_WORKERS, max_per_tenant: int = MAX_JOBS_PER_TENANT):
+        self.max_workers = max_workers
+        self.max_per_tenant = max(1, max_per_tenant)
+        self.jobs: Dict[str, Job] = {}
+        # Jobs handed to the pool per tenant, and jobs waiting for one of those to finish
+        self._active: Dict[str, int] = {}
+        self._waiting: Dict[str, Deque[Job]] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+
+    def _start(self):
+        if self._executor is None:
+            self._manager = multiprocessing.Manager()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+
+    def submit(self, options: Dict[str, Any], tenant_id: str = DEFAULT_TENANT) -> Job:
+        """Queue a generation job for a tenant"""
+        with self._lock:
+            self._start()
+            job = Job(options, self._manager.dict(), tenant_id)
+            self.jobs[job.id] = job
+            self._evict_finished()
+            if self._active.get(tenant_id, 0) >= self.max_per_tenant:
+                self._waiting.setdefault(tenant_id, deque()).append(job)
+                return job
+            self._active[tenant_id] = self._active.get(tenant_id, 0) + 1
+        self._dispatch(job)
+        return job
+
+    def get(self, job_id: str, tenant_id: str = DEFAULT_TENANT) -> Optional[Job]:
+        """A job of the tenant; other tenants' jobs are not found"""
+        job = self.jobs.get(job_id)
+        return job if job is not None and job.tenant_id == tenant_id else None
+
+    def all(self, tenant_id: str = DEFAULT_TENANT) -> List[Job]:
+        jobs = [job for job in self.jobs.values() if job.tenant_id == tenant_id]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str, tenant_id: str = DEFAULT_TENANT) -> Optional[Job]:
+        """Cancel a queued job, or ask a running one to stop"""
+        job = self.get(job_id, tenant_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+        with self._lock:
+            waiting = self._waiting.get(job.tenant_id)
+            if job.future is None and waiting and job in waiting:
+                waiting.remove(job)
+                job._finish(CANCELLED)
+                return job
+        # A job just taken off the waiting queue may not have its future yet;
+        # the worker then stops on the flag before it starts generating
+        future = job.future
+        if future is None or not future.cancel():
+            job.progress["cancel_requested"] = True
+        return job
+
+    def shutdown(self):
+        if self._executor is not None:
+            for job in list(self.jobs.values()):
+                if job.status not in FINISHED_STATES:
+                    self.cancel(job.id, job.tenant_id)
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._manager.shutdown()
+            self._executor = None
+            self._manager = None
+
+    def _dispatch(self, job: Job):
+        job.future = self._executor.submit(_run_job, job.options, job.progress, job.tenant_id)
+        job.future.add_done_callback(lambda future: self._on_done(job, future))
+
+    def _on_done(self, job: Job, future: Future):
+        # Hand the tenant's slot to its next waiting job
+        with self._lock:
+            waiting = self._waiting.get(job.tenant_id)
+            following = waiting.popleft() if waiting else None
+            if waiting is not None and not waiting:
+                del self._waiting[job.tenant_id]
+            if following is None:
+                self._active[job.tenant_id] -= 1
+                if not self._active[job.tenant_id]:
+                    del self._active[job.tenant_id]
+        if following is not None and self._executor is not None:
+            self._dispatch(following)
+
+        if future.cancelled():
+            job._finish(CANCELLED)
+            return
+        error = future.exception()
+        if error is None:
+            job.result = future.result()
+            metrics_registry.record(job.result, job.tenant_id)
+            job._finish(COMPLETED)
+        elif isinstance(error, GenerationCancelled):
+            job._finish(CANCELLED)
+        else:
+            job.error = f"{type(error).__name__}: {error}"
+            job._finish(FAILED)
+
+    def _evict_finished(self):
+        finished = [job for job in self.jobs.values() if job.status in FINISHED_STATES]
+        if len(finished) > MAX_FINISHED_JOBS:
+            finished.sort(key=lambda job: job.finished_at)
+            for job in finished[:len(finished) - MAX_FINISHED_JOBS]:
+                del self.jobs[job.id]
+
+
+job_manager = JobManager()
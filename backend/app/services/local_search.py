@@ -0,0 +1,342 @@
+"""Simulated-annealing improvement phase run after the solver engine
+
+Starting from the engine's timetable, the search relocates blocks (a
+lesson's consecutive periods on one day), swaps two blocks of a class, and
+inserts pending blocks (ejecting and re-placing an occupant when needed). Every move goes through the
+generator's _unassign_slot/_is_slot_valid/_assign_slot, so hard
+constraints are exactly those of the initial placement.
+
+The objective is the weighted soft-constraint score of scoring.Scorer;
+it decomposes into per (class, day) and per (faculty, day) terms, so a
+move is scored by re-evaluating only the few terms it touches.
+"""
+from typing import Any, Dict, List, Optional, Set, Tuple
+import math
+import time
+from .scoring import Scorer
+from .slot_masks import block_mask, slot_list
+
+# Annealing schedule
+START_TEMPERATURE = 5.0
+END_TEMPERATURE = 0.05
+
+# Number of convergence samples kept in stats
+TRACE_POINTS = 50
+
+
+class LocalSearch:
+    def __init__(self, generator, lessons: List, time_limit: float = 2.0, scorer: Optional[Scorer] = None,
+                 max_iterations: Optional[int] = None):
+        self.gen = generator
+        self.scorer = scorer or Scorer(generator)
+        self.rng = generator.rng
+        self.calendar = calendar = generator.calendar
+        self.time_limit = time_limit
+        # When set, the search runs exactly this many iterations and cools by
+        # iteration count rather than elapsed time, so a seeded run is reproducible
+        self.max_iterations = max_iterations
+        # lesson_id -> (lesson, course, faculty, class_name)
+        self.info: Dict[int, Tuple] = {}
+        for lesson in lessons:
+            resolved = generator._resolve_lesson(lesson)
+            if resolved:
+                course, faculty, _, class_name = resolved
+                self.info[lesson.id] = (lesson, course, faculty, class_name)
+
+        # Placed blocks as (class_name, first slot) with O(1) removal, and their lengths
+        self.placed: List[Tuple[str, int]] = []
+        self.placed_pos: Dict[Tuple[str, int], int] = {}
+        self.lengths: Dict[Tuple[str, int], int] = {}
+        for class_name, schedule in generator.timetable.items():
+            for day_index, day in enumerate(calendar.days):
+                period = 0
+                while period < len(schedule[day]):
+                    if schedule[day][period]:
+                        first, length = generator._block_at(class_name, day_index, period)
+                        self._track((class_name, calendar.slot_index(day_index, first)), length)
+                        period = first + length
+                    else:
+                        period += 1
+
+    def run(self) -> Dict[str, Any]:
+        """Improve the generator's timetable in place and return search stats"""
+        started = time.perf_counter()
+        score = initial_score = self.full_score()
+        best_score = score
+        best_state = self._snapshot()
+        iterations = accepted = improved = 0
+        trace = [{"iteration": 0, "ms": 0.0, "score": score, "pending": len(self.gen.pending_lessons)}]
+        sample_every = max(1, self.max_iterations // TRACE_POINTS) if self.max_iterations else None
+
+        while True:
+            elapsed = time.perf_counter() - started
+            if self.max_iterations:
+                done = iterations / self.max_iterations
+            else:
+                done = elapsed / self.time_limit
+            if done >= 1 or (not self.placed and not self.gen.pending_lessons):
+                break
+            temperature = START_TEMPERATURE * (END_TEMPERATURE / START_TEMPERATURE) ** done
+            iterations += 1
+
+            move = self._propose()
+            if move is not None:
+                delta, undo = move
+                if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                    score += delta
+                    accepted += 1
+                    if score < best_score:
+                        best_score = score
+                        best_state = self._snapshot()
+                        improved += 1
+                else:
+                    undo()
+
+            # Sample the convergence curve at a rate derived from the first 100 iterations
+            if sample_every is None and iterations == 100:
+                sample_every = max(1, int(100 * self.time_limit / max(elapsed, 1e-6)) // TRACE_POINTS)
+            if sample_every and iterations % sample_every == 0 and len(trace) < TRACE_POINTS:
+                trace.append({
+                    "iteration": iterations,
+                    "ms": round(elapsed * 1000, 2),
+                    "score": score,
+                    "pending": len(self.gen.pending_lessons),
+                })
+
+        if score != best_score:
+            self._restore(best_state)
+            score = best_score
+
+        trace.append({
+            "iteration": iterations,
+            "ms": round((time.perf_counter() - started) * 1000, 2),
+            "score": score,
+            "pending": len(self.gen.pending_lessons),
+        })
+        return {
+            "iterations": iterations,
+            "accepted": accepted,
+            "improvements": improved,
+            "initial_score": initial_score,
+            "final_score": score,
+            "time_ms": trace[-1]["ms"],
+            "trace": trace,
+        }
+
+    # Objective
+
+    def full_score(self) -> float:
+        """Evaluate the whole objective from scratch"""
+        return self.scorer.total()
+
+    def _terms(self, class_days: Set[Tuple[str, int]], faculty_days: Set[Tuple[int, int]]) -> float:
+        """Weighted soft penalty of the given (class, day) and (faculty, day) terms"""
+        return self.scorer.terms(class_days, faculty_days)
+
+    # Moves
+
+    def _propose(self) -> Optional[Tuple[int, Any]]:
+        """Apply a random move, returning (score delta, undo) or None if nothing changed"""
+        if self.gen.pending_lessons and self.rng.random() < 0.5:
+            return self._insert_pending()
+        if not self.placed:
+            return None
+        if self.rng.random() < 0.5:
+            return self._relocate()
+        return self._swap()
+
+    def _relocate(self):
+        """Move one placed block to another valid start in its class"""
+        class_name, slot = self.rng.choice(self.placed)
+        lesson_id, length = self._block(class_name, slot)
+        faculty = self.info[lesson_id][2]
+
+        self._unassign(class_name, slot)
+        free = self.gen._valid_slot_mask(class_name, faculty, self.info[lesson_id][0], length) & ~(1 << slot)
+        self._assign(class_name, slot, lesson_id, length)
+        if not free:
+            return None
+        target = self.rng.choice(slot_list(free))
+
+        affected = self._affected(class_name, [(slot, lesson_id), (target, lesson_id)])
+        before = self._terms(*affected)
+        self._unassign(class_name, slot)
+        self._assign(class_name, target, lesson_id, length)
+        delta = self._terms(*affected) - before
+
+        def undo():
+            self._unassign(class_name, target)
+            self._assign(class_name, slot, lesson_id, length)
+        return delta, undo
+
+    def _swap(self):
+        """Exchange two blocks of different lessons within one class"""
+        class_name, slot_a = self.rng.choice(self.placed)
+        lesson_a, length_a = self._block(class_name, slot_a)
+        occupied = self.gen.class_schedule[class_name] & ~block_mask(slot_a, length_a)
+        if not occupied:
+            return None
+        day_index, period = self.calendar.split_slot(self.rng.choice(slot_list(occupied)))
+        first, _ = self.gen._block_at(class_name, day_index, period)
+        slot_b = self.calendar.slot_index(day_index, first)
+        lesson_b, length_b = self._block(class_name, slot_b)
+        if lesson_a == lesson_b:
+            return None
+        affected = self._affected(class_name, [(slot_a, lesson_a), (slot_b, lesson_a),
+                                               (slot_a, lesson_b), (slot_b, lesson_b)])
+        before = self._terms(*affected)
+        self._unassign(class_name, slot_a)
+        self._unassign(class_name, slot_b)
+
+        if self._is_valid(class_name, slot_b, lesson_a, length_a):
+            self._assign(class_name, slot_b, lesson_a, length_a)
+            if self._is_valid(class_name, slot_a, lesson_b, length_b):
+                self._assign(class_name, slot_a, lesson_b, length_b)
+                delta = self._terms(*affected) - before
+
+                def undo():
+                    self._unassign(class_name, slot_a)
+                    self._unassign(class_name, slot_b)
+                    self._assign(class_name, slot_a, lesson_a, length_a)
+                    self._assign(class_name, slot_b, lesson_b, length_b)
+                return delta, undo
+            self._unassign(class_name, slot_b)
+
+        self._assign(class_name, slot_a, lesson_a, length_a)
+        self._assign(class_name, slot_b, lesson_b, length_b)
+        return None
+
+    def _insert_pending(self):
+        """Place a pending block, ejecting and re-placing an occupant if needed"""
+        pending_index = self.rng.randrange(len(self.gen.pending_lessons))
+        entry = self.gen.pending_lessons[pending_index]
+        lesson_id = entry["lesson_id"]
+        length = entry.get("periods", 1)
+        if lesson_id not in self.info:
+            return None
+        lesson, _, faculty, class_name = self.info[lesson_id]
+
+        free = self.gen._valid_slot_mask(class_name, faculty, lesson, length)
+        if free:
+            target = self.rng.choice(slot_list(free))
+            affected = self._affected(class_name, [(target, lesson_id)])
+            before = self._terms(*affected)
+            self._assign(class_name, target, lesson_id, length)
+            self.gen.pending_lessons.pop(pending_index)
+            delta = self._terms(*affected) - before - self.scorer.pending_penalty(length)
+
+            def undo():
+                self._unassign(class_name, target)
+                self.gen.pending_lessons.insert(pending_index, entry)
+            return delta, undo
+
+        # Eject the block starting at a random occupied class slot and take its place
+        occupied = self.gen.class_schedule[class_name]
+        if not occupied:
+            return None
+        day_index, period = self.calendar.split_slot(self.rng.choice(slot_list(occupied)))
+        first, _ = self.gen._block_at(class_name, day_index, period)
+        target = self.calendar.slot_index(day_index, first)
+        evicted, evicted_length = self._block(class_name, target)
+        evicted_faculty = self.info[evicted][2]
+        self._unassign(class_name, target)
+        if not self._is_valid(class_name, target, lesson_id, length):
+            self._assign(class_name, target, evicted, evicted_length)
+            return None
+        self._assign(class_name, target, lesson_id, length)
+        refill = self.gen._valid_slot_mask(class_name, evicted_faculty, self.info[evicted][0], evicted_length)
+        new_home = self.rng.choice(slot_list(refill)) if refill else None
+        self._unassign(class_name, target)
+        self._assign(class_name, target, evicted, evicted_length)
+
+        touched = [(target, lesson_id), (target, evicted)]
+        if new_home is not None:
+            touched.append((new_home, evicted))
+        affected = self._affected(class_name, touched)
+        before = self._terms(*affected)
+
+        self._unassign(class_name, target)
+        self._assign(class_name, target, lesson_id, length)
+        self.gen.pending_lessons.pop(pending_index)
+        delta = -self.scorer.pending_penalty(length)
+        evicted_entry = None
+        if new_home is not None:
+            self._assign(class_name, new_home, evicted, evicted_length)
+        else:
+            _, course, _, _ = self.info[evicted]
+            self.gen._add_pending(self.info[evicted][0], course, evicted_faculty, class_name, evicted_length)
+            evicted_entry = self.gen.pending_lessons[-1]
+            delta += self.scorer.pending_penalty(evicted_length)
+        delta += self._terms(*affected) - before
+
+        def undo():
+            if new_home is not None:
+                self._unassign(class_name, new_home)
+            else:
+                self.gen.pending_lessons.remove(evicted_entry)
+            self._unassign(class_name, target)
+            self._assign(class_name, target, evicted, evicted_length)
+            self.gen.pending_lessons.insert(pending_index, entry)
+        return delta, undo
+
+    # State helpers
+
+    def _affected(self, class_name: str, touched: List[Tuple[int, int]]):
+        """(class, day) and (faculty, day) terms touched by (slot, lesson_id) pairs of a move"""
+        periods_per_day = self.calendar.periods_per_day
+        class_days = {(class_name, slot // periods_per_day) for slot, _ in touched}
+        faculty_days = {
+            (faculty_id, slot // periods_per_day)
+            for slot, lesson_id in touched
+            for faculty_id in self.gen.lesson_faculty_ids[lesson_id]
+        }
+        return class_days, faculty_days
+
+    def _block(self, class_name: str, slot: int) -> Tuple[int, int]:
+        """(lesson_id, length) of the placed block starting at a slot"""
+        day_index, period = self.calendar.split_slot(slot)
+        day = self.calendar.days[day_index]
+        return self.gen.timetable[class_name][day][period]["lesson_id"], self.lengths[(class_name, slot)]
+
+    def _is_valid(self, class_name: str, slot: int, lesson_id: int, length: int) -> bool:
+        lesson, _, faculty, _ = self.info[lesson_id]
+        day_index, period = self.calendar.split_slot(slot)
+        return self.gen._is_slot_valid(class_name, self.calendar.days[day_index], period, faculty, lesson, length)
+
+    def _assign(self, class_name: str, slot: int, lesson_id: int, length: int):
+        lesson, course, faculty, _ = self.info[lesson_id]
+        day_index, period = self.calendar.split_slot(slot)
+        self.gen._assign_slot(class_name, self.calendar.days[day_index], period, lesson, course, faculty, length)
+        self._track((class_name, slot), length)
+
+    def _unassign(self, class_name: str, slot: int):
+        lesson_id, length = self._block(class_name, slot)
+        lesson, _, faculty, _ = self.info[lesson_id]
+        day_index, period = self.calendar.split_slot(slot)
+        self.gen._unassign_slot(class_name, self.calendar.days[day_index], period, lesson, faculty, length)
+        self._untrack((class_name, slot))
+
+    def _track(self, key: Tuple[str, int], length: int):
+        self.placed_pos[key] = len(self.placed)
+        self.placed.append(key)
+        self.lengths[key] = length
+
+    def _untrack(self, key: Tuple[str, int]):
+        index = self.placed_pos.pop(key)
+        del self.lengths[key]
+        last = self.placed.pop()
+        if last != key:
+            self.placed[index] = last
+            self.placed_pos[last] = index
+
+    def _snapshot(self) -> Tuple[Dict[Tuple[str, int], Tuple[int, int]], List[Dict]]:
+        placements = {key: self._block(*key) for key in self.placed}
+        return placements, list(self.gen.pending_lessons)
+
+    def _restore(self, state):
+        placements, pending = state
+        for key in list(self.placed):
+            self._unassign(*key)
+        for (class_name, slot), (lesson_id, length) in placements.items():
+            self._assign(class_name, slot, lesson_id, length)
+        self.gen.pending_lessons[:] = pending
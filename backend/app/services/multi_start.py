@@ -0,0 +1,125 @@
+"""Multi-start generation: several seeded runs, best result kept
+
+Slot choice is randomized, so independent runs over the same data end
+with different numbers of pending lessons. The master data is loaded once
+into a ProblemData snapshot and every run gets its own seed; runs are
+spread over a process pool so they scale with the host's cores.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import os
+import random
+import time
+from sqlalchemy.orm import Session
+from ..database import DEFAULT_TENANT
+from .problem_data import ProblemData
+from .timetable_generator import TimetableGenerator
+
+DEFAULT_WORKERS = int(os.environ.get("TIMETABLE_MULTI_START_WORKERS", os.cpu_count() or 1))
+
+
+def _pending_periods(generator: TimetableGenerator) -> int:
+    return sum(entry.get("periods", 1) for entry in generator.pending_lessons)
+
+
+def _quality(generator: TimetableGenerator) -> float:
+    return generator.scorer.total()
+
+
+# Ranking keys per score name, lower is better
+SCORES: Dict[str, Callable[[TimetableGenerator], Tuple]] = {
+    # Fewest unplaced periods, ties broken by the soft objective
+    "pending": lambda generator: (_pending_periods(generator), _quality(generator)),
+    # Weighted soft-constraint score, pending periods included (see scoring)
+    "quality": lambda generator: (_quality(generator),),
+}
+
+
+def _run_seed(data: ProblemData, seed: int, engine: str, score: str, instrument: bool,
+              options: Dict[str, Any]) -> Tuple[Tuple, Dict[str, Any]]:
+    """Worker entry point: one seeded generation over the snapshot"""
+    started = time.perf_counter()
+    generator = TimetableGenerator(None, data=data, seed=seed, instrument=instrument)
+    result = generator.generate(engine, **options)
+    key = SCORES[score](generator)
+    result["stats"]["run_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return key, result
+
+
+def generate_multi_start(db: Session, engine: str = "greedy", runs: int = 4, workers: Optional[int] = None,
+                         score: str = "pending", seed: Optional[int] = None, instrument: bool = False,
+                         progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                         data: Optional[ProblemData] = None, tenant_id: str = DEFAULT_TENANT,
+                         **options) -> Dict[str, Any]:
+    """Run ``runs`` seeded generations over one tenant's data and return the best by ``score``
+
+    The tenant's data is ``data`` when given, otherwise read from ``db``.
+
+    Run i uses ``seed + i``, so a base seed reproduces the whole set and
+    any single run can be repeated alone with its own seed. The winner's
+    stats gain a ``multi_start`` entry with the score and key stats of
+    every seed. With one worker the runs execute in this process.
+    """
+    if score not in SCORES:
+        raise ValueError(f"Unknown score '{score}', expected one of {sorted(SCORES)}")
+    started = time.perf_counter()
+    data = data or ProblemData.load(db, tenant_id)
+    if seed is None:
+        seed = random.randrange(2 ** 31)
+    seeds = [seed + i for i in range(runs)]
+    workers = max(1, min(workers or DEFAULT_WORKERS, runs))
+
+    outcomes: List[Tuple[Tuple, Dict[str, Any]]] = []
+
+    def report():
+        if progress_callback:
+            best = min(outcomes, key=lambda outcome: outcome[0]) if outcomes else None
+            progress_callback({
+                "phase": "multi_start",
+                "runs_done": len(outcomes),
+                "runs": runs,
+                "pending": best[1]["stats"]["total_pending"] if best else None,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            })
+
+    report()
+    if workers == 1:
+        for run_seed in seeds:
+            outcomes.append(_run_seed(data, run_seed, engine, score, instrument, options))
+            report()
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_seed, data, run_seed, engine, score, instrument, options)
+                       for run_seed in seeds]
+            try:
+                for future in as_completed(futures):
+                    outcomes.append(future.result())
+                    report()
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    best_key, best = min(outcomes, key=lambda outcome: outcome[0])
+    best["stats"]["multi_start"] = {
+        "runs": runs,
+        "workers": workers,
+        "score": score,
+        "base_seed": seed,
+        "best_seed": best["stats"]["seed"],
+        "best_score": list(best_key),
+        "time_ms": round((time.perf_counter() - started) * 1000, 2),
+        "seeds": sorted(
+            (
+                {
+                    "seed": result["stats"]["seed"],
+                    "score": list(key),
+                    "placed": result["stats"]["total_lessons_placed"],
+                    "pending": result["stats"]["total_pending"],
+                    "run_ms": result["stats"]["run_ms"],
+                }
+                for key, result in outcomes
+            ),
+            key=lambda run: run["score"],
+        ),
+    }
+    return best
@@ -0,0 +1,178 @@
+"""Picklable, preprocessed snapshot of the master data a generation run reads
+
+ORM rows are bound to a session and cannot cross a process boundary, so
+the rows the generator needs are copied once into plain Records. A
+ProblemData can then be handed to any number of worker processes, none
+of which touch the database.
+
+Everything the generator would otherwise recompute per lesson or per slot
+check (id lookups, class labels, faculty names, compiled time off and
+room availability, class and course availability, per-day limits, the
+timetable row and teaching staff of each lesson) is derived once here. The snapshot is
+never modified after construction, so runs may share it freely.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import time
+from sqlalchemy.orm import Session
+from ..models.course import Course
+from ..models.class_model import Class
+from ..models.faculty import Faculty
+from ..models.lesson import Lesson
+from ..models.classroom import Classroom
+from ..models.calendar import SchoolCalendar
+from ..database import DEFAULT_TENANT
+from .slot_masks import Calendar
+
+
+class Record:
+    """Detached copy of an ORM row's column values, read as attributes"""
+
+    def __init__(self, **fields: Any):
+        self.__dict__.update(fields)
+
+    @classmethod
+    def from_row(cls, row) -> "Record":
+        return cls(**{column.key: getattr(row, column.key) for column in row.__table__.columns})
+
+    def __repr__(self) -> str:
+        return f"Record(id={self.__dict__.get('id')})"
+
+
+def class_label(cls) -> str:
+    """Display name of a class, used as its timetable key"""
+    return f"{cls.name} {cls.division}" if cls.division else cls.name
+
+
+def group_label(class_name: str, group: str) -> str:
+    """Timetable key of one batch group of a class"""
+    return f"{class_name} ({group})"
+
+
+class ProblemData:
+    def __init__(self, classes: List[Record], lessons: List[Record], courses: List[Record],
+                 faculties: List[Record], classrooms: List[Record], calendar: Optional[Calendar] = None,
+                 tenant_id: str = DEFAULT_TENANT):
+        self.tenant_id = tenant_id
+        # Milliseconds load() spent reading and preprocessing the rows
+        self.load_ms = 0.0
+        # Days and periods of the week; every mask below is laid out by it
+        self.calendar = calendar = calendar or Calendar()
+        self.classes = tuple(classes)
+        self.lessons = tuple(lessons)
+        self.courses = tuple(courses)
+        self.faculties = tuple(faculties)
+        self.classrooms = tuple(classrooms)
+
+        # Id indexes
+        self.class_by_id = {cls.id: cls for cls in self.classes}
+        self.lesson_by_id = {lesson.id: lesson for lesson in self.lessons}
+        self.course_by_id = {course.id: course for course in self.courses}
+        self.faculty_by_id = {faculty.id: faculty for faculty in self.faculties}
+        self.classroom_by_id = {classroom.id: classroom for classroom in self.classrooms}
+
+        self.class_names = {cls.id: class_label(cls) for cls in self.classes}
+
+        # Slots each class and course must stay out of: outside available_slots,
+        # or in a class's restrictions["blocked_slots"]
+        full_week = calendar.full_week_mask
+        self.class_unavailable = {
+            cls.id: (full_week & ~calendar.available_slots_mask(cls.available_slots))
+            | calendar.time_off_mask((cls.restrictions or {}).get("blocked_slots"))
+            for cls in self.classes
+        }
+        self.course_unavailable = {
+            course.id: full_week & ~calendar.available_slots_mask(course.available_slots) for course in self.courses
+        }
+
+        # Faculty display names, compiled time off and resolved per-day limits
+        self.faculty_names = {f.id: f"{f.first_name} {f.last_name}" for f in self.faculties}
+        self.faculty_time_off = {f.id: calendar.time_off_mask(f.time_off) for f in self.faculties}
+        self.faculty_max_per_day = {
+            f.id: (f.constraints or {}).get("max_periods_per_day", calendar.periods_per_day) for f in self.faculties
+        }
+
+        # Compiled room availability and rooms per classroom_type
+        self.classroom_available = {
+            room.id: calendar.availability_mask(room.availability) for room in self.classrooms
+        }
+        rooms_by_type: Dict[str, List[int]] = {}
+        for room in self.classrooms:
+            rooms_by_type.setdefault(room.classroom_type or "regular", []).append(room.id)
+        self.rooms_by_type = {room_type: tuple(rooms) for room_type, rooms in rooms_by_type.items()}
+
+        # (course, faculty, class, timetable row) of every lesson whose references
+        # resolve. Grouped lessons of a class with batch_count > 1 get one row
+        # per group, so the class's batches can run in parallel
+        self.lesson_refs: Dict[int, Tuple[Record, Record, Record, str]] = {}
+        self.group_rows: Dict[str, List[str]] = {name: [] for name in self.class_names.values()}
+        self.row_class: Dict[str, str] = {name: name for name in self.class_names.values()}
+        for lesson in self.lessons:
+            course = self.course_by_id.get(lesson.course_id)
+            faculty = self.faculty_by_id.get(lesson.faculty_id)
+            cls = self.class_by_id.get(lesson.class_id)
+            if not (course and faculty and cls):
+                continue
+            row = class_name = self.class_names[cls.id]
+            if lesson.group and (cls.batch_count or 1) > 1:
+                row = group_label(class_name, lesson.group)
+                if row not in self.row_class:
+                    self.row_class[row] = class_name
+                    self.group_rows[class_name].append(row)
+            self.lesson_refs[lesson.id] = (course, faculty, cls, row)
+
+        # Everyone teaching each lesson, primary faculty first, and their combined
+        # time off. lesson_blocked also folds in class and course availability,
+        # so the placement loop tests every static constraint with one mask
+        self.lesson_faculty_ids: Dict[int, Tuple[int, ...]] = {}
+        self.lesson_time_off: Dict[int, int] = {}
+        self.lesson_blocked: Dict[int, int] = {}
+        for lesson_id, (course, faculty, cls, _) in self.lesson_refs.items():
+            shared = self.lesson_by_id[lesson_id].shared_faculty_ids or []
+            faculty_ids = tuple(dict.fromkeys(
+                [faculty.id] + [fid for fid in shared if fid in self.faculty_by_id]
+            ))
+            time_off = 0
+            for fid in faculty_ids:
+                time_off |= self.faculty_time_off[fid]
+            self.lesson_faculty_ids[lesson_id] = faculty_ids
+            self.lesson_time_off[lesson_id] = time_off
+            self.lesson_blocked[lesson_id] = (
+                time_off | self.class_unavailable[cls.id] | self.course_unavailable[course.id]
+            )
+
+    @classmethod
+    def load(cls, db: Session, tenant_id: str = DEFAULT_TENANT) -> "ProblemData":
+        """Read the tenant's rows of every table the generator needs, one query per table, and detach them"""
+        started = time.perf_counter()
+
+        # Ordered by id, so a seed replays the same run whatever the database's physical row order
+        def records(model) -> List[Record]:
+            rows = db.query(model).filter(model.tenant_id == tenant_id).order_by(model.id).all()
+            return [Record.from_row(row) for row in rows]
+
+        school_calendar = (
+            db.query(SchoolCalendar).filter(SchoolCalendar.tenant_id == tenant_id).order_by(SchoolCalendar.id).first()
+        )
+        data = cls(
+            classes=records(Class),
+            lessons=records(Lesson),
+            courses=records(Course),
+            faculties=records(Faculty),
+            classrooms=records(Classroom),
+            calendar=Calendar.from_record(school_calendar) if school_calendar else None,
+            tenant_id=tenant_id,
+        )
+        data.load_ms = round((time.perf_counter() - started) * 1000, 3)
+        return data
+
+    def fingerprint(self) -> str:
+        """Content hash of every row, stable across processes and row order"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(self.calendar.to_dict(), sort_keys=True).encode())
+        for table in ("classes", "lessons", "courses", "faculties", "classrooms"):
+            digest.update(table.encode())
+            for record in sorted(getattr(self, table), key=lambda r: r.id):
+                digest.update(json.dumps(record.__dict__, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
@@ -0,0 +1,142 @@
+"""Cache of generation results keyed by a fingerprint of their inputs
+
+The key hashes the master data snapshot together with the engine and
+generation options, so a request is only answered from the cache when
+it would run the exact same search. Only seeded requests are cached: a
+request without a seed asks for a fresh random timetable each time.
+
+Entries live in a bounded in-process LRU and, when
+TIMETABLE_RESULT_CACHE_DIR is set, also as JSON files there, shared by
+every worker process. Keys start with the snapshot's tenant, so writes
+through the master data routers clear only that tenant's entries; the
+fingerprint keeps the cache correct for changes made any other way.
+Entry and hit counts are reported per tenant as well.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+import threading
+from .problem_data import ProblemData
+
+# Entries kept in memory (and on disk); 0 disables caching
+CACHE_SIZE = int(os.environ.get("TIMETABLE_RESULT_CACHE_SIZE", 32))
+CACHE_DIR = os.environ.get("TIMETABLE_RESULT_CACHE_DIR")
+
+
+def cache_key(data: ProblemData, engine: str, options: Dict[str, Any]) -> str:
+    """Fingerprint of a generation request over a data snapshot, prefixed with its tenant"""
+    request = json.dumps({"engine": engine, **options}, sort_keys=True, default=str)
+    digest = hashlib.sha256(f"{data.fingerprint()}:{request}".encode()).hexdigest()
+    return f"{data.tenant_id}+{digest}"
+
+
+def key_tenant(key: str) -> str:
+    """Tenant a cache key belongs to"""
+    return key.split("+", 1)[0]
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = CACHE_SIZE, directory: Optional[str] = CACHE_DIR):
+        self.max_entries = max_entries
+        self.directory = directory
+        # Hits and misses per tenant
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """A fresh copy of the cached result, or None"""
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+        if payload is None and self.directory:
+            payload = self._read_file(key)
+            if payload is not None:
+                self._remember(key, payload)
+        tenant_id = key_tenant(key)
+        if payload is None:
+            self.misses[tenant_id] = self.misses.get(tenant_id, 0) + 1
+            return None
+        self.hits[tenant_id] = self.hits.get(tenant_id, 0) + 1
+        return json.loads(payload)
+
+    def put(self, key: str, result: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        payload = json.dumps(result, default=str)
+        self._remember(key, payload)
+        if self.directory:
+            self._write_file(key, payload)
+
+    def clear(self, tenant_id: Optional[str] = None):
+        """Drop every entry, or only those of one tenant"""
+        prefix = f"{tenant_id}+" if tenant_id is not None else ""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(".json") and name.startswith(prefix):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except FileNotFoundError:
+                        pass
+
+    def info(self, tenant_id: str) -> Dict[str, Any]:
+        """Size and hit counts of one tenant's entries; max_entries is shared by all tenants"""
+        prefix = f"{tenant_id}+"
+        with self._lock:
+            entries = sum(1 for key in self._entries if key.startswith(prefix))
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "directory": self.directory,
+            "hits": self.hits.get(tenant_id, 0),
+            "misses": self.misses.get(tenant_id, 0),
+        }
+
+    def _remember(self, key: str, payload: str):
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_file(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key)) as f:
+                payload = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(self._path(key))
+        return payload
+
+    def _write_file(self, key: str, payload: str):
+        # Write then rename, so concurrent readers never see a partial file
+        temporary = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            f.write(payload)
+        os.replace(temporary, self._path(key))
+        # Keep only the most recently used files
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")]
+        if len(files) > self.max_entries:
+            files.sort(key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+            for path in files[:len(files) - self.max_entries]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+result_cache = ResultCache()
@@ -0,0 +1,139 @@
+"""Weighted soft-constraint scoring of a timetable
+
+Hard constraints decide where a lesson may go; the soft constraints here
+measure how good the result is. Each one counts penalty units (an idle
+faculty period, a repeated course in a day, ...) that are multiplied by a
+per-request weight, and the weighted total is what local search
+minimizes and multi-start runs are ranked by. Lower is better.
+
+Scores are read straight off the generator's occupancy bitmasks and
+timetable rows, and decompose into (row, day), (faculty, day) and
+per-faculty terms. A whole timetable is scored in one pass over those
+terms, and a move is re-scored by evaluating only the few terms it
+touches, whatever the size of the school.
+"""
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+# Penalty per unit of each soft constraint
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "pending": 100,  # per unplaced period
+    "faculty_gap": 1,  # per idle period between a faculty's first and last class of the day
+    "cluster": 3,  # per extra lesson of the same course in one class day
+    "day_load": 1,  # squared periods per class day, rewards even spreading
+    "late_heavy": 2,  # per period of a heavy course in the second half of a day
+    "faculty_days": 5,  # per teaching day above a faculty's constraints["max_days"]
+}
+
+
+def resolve_weights(weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Default weights overridden by the given ones"""
+    unknown = sorted(set(weights or {}) - set(DEFAULT_WEIGHTS))
+    if unknown:
+        raise ValueError(f"Unknown soft constraint(s) {unknown}, expected one of {sorted(DEFAULT_WEIGHTS)}")
+    return {**DEFAULT_WEIGHTS, **(weights or {})}
+
+
+class Scorer:
+    """Soft-constraint score of a generator's current timetable
+
+    ``heavy_course_ids`` are the courses penalized by ``late_heavy``; a
+    faculty's ``faculty_days`` limit is ``constraints["max_days"]``.
+    """
+
+    def __init__(self, generator, weights: Optional[Dict[str, float]] = None,
+                 heavy_course_ids: Iterable[int] = ()):
+        self.gen = generator
+        self.calendar = calendar = generator.calendar
+        self.weights = resolve_weights(weights)
+        self.heavy_course_ids = frozenset(heavy_course_ids or ())
+        self.day_bits = (1 << calendar.periods_per_day) - 1
+        # First late period of each day
+        self.late_from = [count // 2 for count in calendar.day_periods]
+        # Faculties with a max_days limit
+        self.max_days = {
+            faculty_id: faculty.constraints["max_days"]
+            for faculty_id, faculty in generator.faculties.items()
+            if (faculty.constraints or {}).get("max_days")
+        }
+
+    def all_terms(self) -> Tuple[Set[Tuple[str, int]], Set[Tuple[int, int]]]:
+        """Every (row, day) and (faculty, day) term of the timetable"""
+        days = range(len(self.calendar.days))
+        row_days = {(row, d) for row in self.gen.timetable for d in days}
+        faculty_days = {(faculty_id, d) for faculty_id in self.gen.faculty_schedule for d in days}
+        return row_days, faculty_days
+
+    def counts(self, row_days: Set[Tuple[str, int]], faculty_days: Set[Tuple[int, int]]) -> Dict[str, int]:
+        """Penalty units of the given terms per soft constraint, pending periods excluded
+
+        The faculty_days excess of every faculty named in ``faculty_days``
+        is counted once.
+        """
+        calendar = self.calendar
+        heavy = self.heavy_course_ids
+        day_load = cluster = late_heavy = faculty_gap = faculty_days_over = 0
+
+        for row, d in row_days:
+            load = bin(self.gen.class_schedule[row] & calendar.day_masks[d]).count("1")
+            if not load:
+                continue
+            day_load += load * load
+            # A multi-period block is one lesson, so only other lessons of its course cluster
+            courses = set()
+            lessons = set()
+            for period, cell in enumerate(self.gen.timetable[row][calendar.days[d]]):
+                if cell:
+                    course_id = cell["course_id"]
+                    courses.add(course_id)
+                    lessons.add((course_id, cell["lesson_id"]))
+                    if course_id in heavy and period >= self.late_from[d]:
+                        late_heavy += 1
+            cluster += len(lessons) - len(courses)
+
+        for faculty_id, d in faculty_days:
+            bits = (self.gen.faculty_schedule[faculty_id] >> (d * calendar.periods_per_day)) & self.day_bits
+            if bits:
+                first = (bits & -bits).bit_length() - 1
+                faculty_gap += bits.bit_length() - first - bin(bits).count("1")
+
+        for faculty_id in {faculty_id for faculty_id, _ in faculty_days}:
+            max_days = self.max_days.get(faculty_id)
+            if max_days:
+                schedule = self.gen.faculty_schedule[faculty_id]
+                days = sum(1 for day_mask in calendar.day_masks if schedule & day_mask)
+                faculty_days_over += max(days - max_days, 0)
+
+        return {
+            "faculty_gap": faculty_gap,
+            "cluster": cluster,
+            "day_load": day_load,
+            "late_heavy": late_heavy,
+            "faculty_days": faculty_days_over,
+        }
+
+    def terms(self, row_days: Set[Tuple[str, int]], faculty_days: Set[Tuple[int, int]]) -> float:
+        """Weighted penalty of the given terms"""
+        weights = self.weights
+        return sum(weights[name] * units for name, units in self.counts(row_days, faculty_days).items() if units)
+
+    def pending_penalty(self, periods: int) -> float:
+        return self.weights["pending"] * periods
+
+    def pending_periods(self) -> int:
+        return sum(entry.get("periods", 1) for entry in self.gen.pending_lessons)
+
+    def total(self) -> float:
+        """Weighted score of the whole timetable"""
+        return self.terms(*self.all_terms()) + self.pending_penalty(self.pending_periods())
+
+    def breakdown(self) -> Dict[str, Any]:
+        """Total, weights, and units and penalty per soft constraint, as reported in stats.score"""
+        counts = {"pending": self.pending_periods(), **self.counts(*self.all_terms())}
+        constraints = {
+            name: {"count": units, "penalty": self.weights[name] * units} for name, units in counts.items()
+        }
+        return {
+            "total": sum(entry["penalty"] for entry in constraints.values()),
+            "weights": dict(self.weights),
+            "constraints": constraints,
+        }
@@ -0,0 +1,168 @@
+"""Bitmask helpers for weekly slot occupancy
+
+Every (day, period) pair of the week maps to one bit, slot index
+``day_index * periods_per_day + period``, so the whole week of a class,
+faculty or classroom fits into a single Python int and checking a lesson
+against all of them is a few bitwise operations.
+
+The layout comes from a Calendar: ``periods_per_day`` is the length of
+the longest day, and the bits of periods a shorter day does not have, or
+that are breaks, are simply never part of ``full_week_mask``.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Defaults, used when no calendar has been stored
+DEFAULT_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+DEFAULT_PERIODS_PER_DAY = 8
+
+
+def block_mask(start: int, length: int) -> int:
+    """Mask of ``length`` consecutive slots beginning at ``start``"""
+    return ((1 << length) - 1) << start
+
+
+def iter_slots(mask: int) -> Iterator[int]:
+    """Yield the set bit indices of a mask in ascending order"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def slot_list(mask: int) -> List[int]:
+    """Set bit indices of a mask as a list"""
+    return list(iter_slots(mask))
+
+
+class Calendar:
+    """Days, periods and breaks of a school week, and the slot layout derived from them
+
+    ``day_periods`` overrides the period count of single days (e.g. a
+    Saturday half day) and ``breaks`` are 0-based periods that are never
+    taught on any day; a block of consecutive periods cannot span one.
+    """
+
+    def __init__(self, days: Optional[Iterable[str]] = None, periods_per_day: int = DEFAULT_PERIODS_PER_DAY,
+                 day_periods: Optional[Dict[str, int]] = None, breaks: Optional[Iterable[int]] = None):
+        self.days = list(days) if days else list(DEFAULT_DAYS)
+        self.day_periods = [int((day_periods or {}).get(day, periods_per_day)) for day in self.days]
+        self.breaks = sorted(set(breaks or []))
+        self.periods_per_day = max(self.day_periods)
+        self.slots_per_week = len(self.days) * self.periods_per_day
+        self.day_index = {day: i for i, day in enumerate(self.days)}
+
+        # day_masks[d] has every period of day d set
+        self.day_masks = [
+            ((1 << self.periods_per_day) - 1) << (d * self.periods_per_day) for d in range(len(self.days))
+        ]
+        # Every slot that can be taught
+        self.full_week_mask = 0
+        for d, count in enumerate(self.day_periods):
+            for period in range(count):
+                if period not in self.breaks:
+                    self.full_week_mask |= self.slot_bit(d, period)
+        # block_start_masks[k] has every slot where a block of k consecutive
+        # periods fits before the end of its day without crossing a break
+        self.block_start_masks = [0]
+        for length in range(1, self.periods_per_day + 1):
+            starts = 0
+            for d, count in enumerate(self.day_periods):
+                starts |= ((1 << max(count - length + 1, 0)) - 1) << (d * self.periods_per_day)
+            for shift in range(length):
+                starts &= self.full_week_mask >> shift
+            self.block_start_masks.append(starts)
+
+    @classmethod
+    def from_record(cls, record) -> "Calendar":
+        """Calendar of a stored SchoolCalendar row (or a Record copy of one)"""
+        return cls(record.days, record.periods_per_day, record.day_periods, record.breaks)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "Calendar":
+        """Inverse of to_dict; None or {} gives the default week"""
+        data = data or {}
+        return cls(
+            data.get("days"),
+            data.get("periods_per_day", DEFAULT_PERIODS_PER_DAY),
+            data.get("day_periods"),
+            data.get("breaks"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "days": self.days,
+            "periods_per_day": self.periods_per_day,
+            "day_periods": dict(zip(self.days, self.day_periods)),
+            "breaks": self.breaks,
+        }
+
+    def slot_index(self, day_index: int, period: int) -> int:
+        """Bit index of a (day, period) pair"""
+        return day_index * self.periods_per_day + period
+
+    def slot_bit(self, day_index: int, period: int) -> int:
+        """Single-bit mask for a (day, period) pair"""
+        return 1 << self.slot_index(day_index, period)
+
+    def split_slot(self, index: int) -> Tuple[int, int]:
+        """Inverse of slot_index: (day_index, period)"""
+        return divmod(index, self.periods_per_day)
+
+    def block_starts(self, free: int, length: int) -> int:
+        """Slots where ``length`` consecutive free slots begin within one day
+
+        Sliding-window AND of the free mask with itself shifted by 1..length-1,
+        restricted to starts that leave room before the end of the day.
+        """
+        starts = free
+        for shift in range(1, length):
+            starts &= free >> shift
+        return starts & self.block_start_masks[length]
+
+    def empty_day(self, day_index: int) -> List[Any]:
+        """Blank response cells for one day"""
+        return [""] * self.day_periods[day_index]
+
+    def time_off_mask(self, time_off: Iterable[str]) -> int:
+        """Compile slot entries into a mask: "Monday-3" is one period, "Monday" the whole day"""
+        mask = 0
+        for entry in time_off or []:
+            day, _, period = str(entry).partition("-")
+            day_index = self.day_index.get(day)
+            if day_index is None:
+                continue
+            if not period:
+                mask |= self.day_masks[day_index]
+            elif period.isdigit() and int(period) < self.periods_per_day:
+                mask |= self.slot_bit(day_index, int(period))
+        return mask & self.full_week_mask
+
+    def available_slots_mask(self, available_slots: Iterable[str]) -> int:
+        """Compile an available_slots list (entries as for time_off_mask); empty means always available"""
+        if not available_slots:
+            return self.full_week_mask
+        return self.time_off_mask(available_slots)
+
+    def availability_mask(self, availability) -> int:
+        """Compile Classroom.availability into a mask of usable slots
+
+        ``availability`` maps a day name to either a list of available
+        (0-based) periods or a boolean for the whole day. Days that are not
+        listed, and an empty mapping, are fully available.
+        """
+        mask = self.full_week_mask
+        for day, periods in (availability or {}).items():
+            day_index = self.day_index.get(day)
+            if day_index is None:
+                continue
+            mask &= ~self.day_masks[day_index]
+            if periods is True:
+                mask |= self.day_masks[day_index]
+            elif isinstance(periods, list):
+                for period in periods:
+                    if isinstance(period, int) and 0 <= period < self.periods_per_day:
+                        mask |= self.slot_bit(day_index, period)
+        return mask & self.full_week_mask
+
+
+DEFAULT_CALENDAR = Calendar()
@@ -0,0 +1,264 @@
+"""Solver engines used by TimetableGenerator to place lessons
+
+An engine receives the generator (with its occupancy state already
+initialized) and the lessons to place, and drives placement through the
+generator's own primitives (_valid_slot_mask, _assign_slot,
+_unassign_slot, _add_pending), so every engine obeys the same hard
+constraints.
+"""
+from typing import Any, Dict, List, Type
+import time
+from .slot_masks import slot_list
+
+
+class SolverEngine:
+    """Base class for placement strategies"""
+    name = "base"
+
+    def __init__(self, generator, **options):
+        self.generator = generator
+        self.options = options
+
+    def solve(self, lessons: List) -> Dict[str, Any]:
+        """Place lessons into the generator's timetable and return engine stats"""
+        raise NotImplementedError
+
+
+class GreedyEngine(SolverEngine):
+    """Single pass, heaviest lessons first, random valid slot per period"""
+    name = "greedy"
+
+    def solve(self, lessons: List) -> Dict[str, Any]:
+        # Sort lessons by priority (more periods_per_week = higher priority)
+        sorted_lessons = sorted(lessons, key=lambda l: l.periods_per_week, reverse=True)
+
+        for lesson in sorted_lessons:
+            self.generator._place_lesson(lesson)
+
+        return {"engine": self.name}
+
+
+class BacktrackingEngine(SolverEngine):
+    """Depth-first search with MRV ordering and forward checking
+
+    Each lesson is a variable needing one start slot per block (see
+    TimetableGenerator._block_lengths). At every node the lesson with the
+    least slack (days that can still take a block minus blocks left to
+    place) is branched on, and after each assignment every other lesson
+    sharing the class, faculty or a scarce room type is checked to still
+    have enough room.
+    The search stops at ``max_nodes`` assignments or ``time_limit``
+    seconds; the deepest partial assignment seen is then kept and whatever
+    is left is placed greedily or reported as pending.
+    """
+    name = "backtracking"
+
+    def __init__(self, generator, max_nodes: int = 20000, time_limit: float = 10.0, **options):
+        super().__init__(generator, **options)
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+
+    def solve(self, lessons: List) -> Dict[str, Any]:
+        gen = self.generator
+        started = time.perf_counter()
+
+        # entries[i] = [lesson, course, faculty, class_name, remaining block lengths, longest first]
+        entries = []
+        for lesson in lessons:
+            resolved = gen._resolve_lesson(lesson)
+            blocks = gen._block_lengths(lesson)
+            if resolved and blocks:
+                course, faculty, _, class_name = resolved
+                entries.append([lesson, course, faculty, class_name, blocks])
+
+        # Lessons that share a class (batch groups included) or any faculty
+        # constrain each other, and so do lessons competing for a room type
+        # with fewer rooms than classes using it
+        row_class = gen.data.row_class
+        by_class: Dict[str, List[int]] = {}
+        by_faculty: Dict[int, List[int]] = {}
+        by_room_type: Dict[str, List[int]] = {}
+        for i, entry in enumerate(entries):
+            by_class.setdefault(row_class[entry[3]], []).append(i)
+            for faculty_id in gen.lesson_faculty_ids[entry[0].id]:
+                by_faculty.setdefault(faculty_id, []).append(i)
+            by_room_type.setdefault(entry[0].classroom_type or "regular", []).append(i)
+        scarce_types = {
+            room_type
+            for room_type, members in by_room_type.items()
+            if room_type in gen.rooms_by_type
+            and len(gen.rooms_by_type[room_type]) < len({row_class[entries[i][3]] for i in members})
+        }
+        neighbours = []
+        for entry in entries:
+            related = set(by_class[row_class[entry[3]]])
+            for faculty_id in gen.lesson_faculty_ids[entry[0].id]:
+                related |= set(by_faculty[faculty_id])
+            room_type = entry[0].classroom_type or "regular"
+            if room_type in scarce_types:
+                related |= set(by_room_type[room_type])
+            neighbours.append(related)
+
+        # Lessons that cannot fit even into an empty timetable go straight to pending
+        open_entries = set()
+        for i, entry in enumerate(entries):
+            while entry[4] and self._capacity(entry) < len(entry[4]):
+                gen._add_pending(entry[0], entry[1], entry[2], entry[3], entry[4].pop())
+            if entry[4]:
+                open_entries.add(i)
+
+        stack = []  # (entry index, slot index, block length) in assignment order
+        frames = []  # (entry index, candidate slots, next candidate position)
+        best: List = []
+        nodes = 0
+        backtracks = 0
+        complete = False
+        exhausted = False
+
+        def assign(i: int, slot: int, length: int):
+            entry = entries[i]
+            day_index, period = gen.calendar.split_slot(slot)
+            gen._assign_slot(entry[3], gen.calendar.days[day_index], period, entry[0], entry[1], entry[2], length)
+            entry[4].remove(length)
+            if not entry[4]:
+                open_entries.discard(i)
+            stack.append((i, slot, length))
+
+        def unassign():
+            i, slot, length = stack.pop()
+            entry = entries[i]
+            day_index, period = gen.calendar.split_slot(slot)
+            gen._unassign_slot(entry[3], gen.calendar.days[day_index], period, entry[0], entry[2], length)
+            entry[4].append(length)
+            entry[4].sort(reverse=True)
+            open_entries.add(i)
+
+        def forward_check(i: int) -> bool:
+            return all(self._capacity(entries[j]) >= len(entries[j][4])
+                       for j in neighbours[i] if j in open_entries)
+
+        # Restarts with a growing node cutoff keep one bad early choice from
+        # consuming the whole budget
+        cutoff = max(4 * len(entries), 200)
+        restarts = 0
+        while True:
+            frames = []
+            run_nodes = 0
+            pick_next = True
+            while True:
+                if pick_next:
+                    if not open_entries:
+                        complete = True
+                        break
+                    i = self._select(entries, open_entries)
+                    frames.append((i, self._order_values(i, entries, neighbours[i], open_entries), 0))
+
+                # Try the next candidate of the top frame
+                i, candidates, pos = frames[-1]
+                length = entries[i][4][0]
+                pick_next = False
+                while pos < len(candidates):
+                    slot = candidates[pos]
+                    pos += 1
+                    nodes += 1
+                    run_nodes += 1
+                    assign(i, slot, length)
+                    if forward_check(i):
+                        pick_next = True
+                        break
+                    unassign()
+                frames[-1] = (i, candidates, pos)
+
+                if pick_next:
+                    if len(stack) > len(best):
+                        best = list(stack)
+                else:
+                    # Candidates exhausted: undo the parent's assignment
+                    frames.pop()
+                    backtracks += 1
+                    if not frames:
+                        break
+                    unassign()
+
+                if nodes >= self.max_nodes or time.perf_counter() - started >= self.time_limit:
+                    exhausted = True
+                    break
+                if run_nodes >= cutoff:
+                    break
+
+            # Stop when solved, out of budget, or the whole tree was searched
+            if complete or exhausted or not frames:
+                break
+            while stack:
+                unassign()
+            restarts += 1
+            cutoff = int(cutoff * 1.5)
+
+        if not complete:
+            # Keep the deepest partial assignment found
+            while stack:
+                unassign()
+            for i, slot, length in best:
+                assign(i, slot, length)
+
+        # Whatever is still open gets one greedy attempt per block
+        for i in sorted(open_entries):
+            lesson, course, faculty, class_name, remaining = entries[i]
+            for length in list(remaining):
+                slot = gen._find_valid_slot(lesson, class_name, faculty, None, length)
+                if slot:
+                    gen._assign_slot(class_name, slot[0], slot[1], lesson, course, faculty, length)
+                else:
+                    gen._add_pending(lesson, course, faculty, class_name, length)
+
+        return {
+            "engine": self.name,
+            "nodes": nodes,
+            "backtracks": backtracks,
+            "restarts": restarts,
+            "complete": complete,
+            "budget_exhausted": exhausted,
+            "search_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def _capacity(self, entry: List) -> int:
+        """How many more blocks of this lesson could still fit (one per day)"""
+        lesson, _, faculty, class_name, remaining = entry
+        if not remaining:
+            return 0
+        mask = self.generator._valid_slot_mask(class_name, faculty, lesson, remaining[-1])
+        return sum(1 for day_mask in self.generator.calendar.day_masks if mask & day_mask)
+
+    def _order_values(self, i: int, entries: List, neighbours: set, open_entries: set) -> List[int]:
+        """Candidate slots for entry i, least constraining for open neighbours first"""
+        lesson, _, faculty, class_name, remaining = entries[i]
+        gen = self.generator
+        candidates = slot_list(gen._valid_slot_mask(class_name, faculty, lesson, remaining[0]))
+        neighbour_masks = [
+            gen._valid_slot_mask(entries[j][3], entries[j][2], entries[j][0], entries[j][4][0])
+            for j in neighbours if j != i and j in open_entries
+        ]
+        gen.rng.shuffle(candidates)
+        candidates.sort(key=lambda slot: sum(mask >> slot & 1 for mask in neighbour_masks))
+        return candidates
+
+    def _select(self, entries: List, open_entries: set) -> int:
+        """Most constrained lesson first (MRV), ties broken by remaining periods"""
+        return min(
+            open_entries,
+            key=lambda i: (self._capacity(entries[i]) - len(entries[i][4]), -sum(entries[i][4]), i)
+        )
+
+
+ENGINES: Dict[str, Type[SolverEngine]] = {
+    GreedyEngine.name: GreedyEngine,
+    BacktrackingEngine.name: BacktrackingEngine,
+}
+
+
+def get_engine(name: str) -> Type[SolverEngine]:
+    """Look up a solver engine class by name"""
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown solver engine '{name}', expected one of {sorted(ENGINES)}")
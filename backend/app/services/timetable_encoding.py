@@ -0,0 +1,78 @@
+"""Alternative encodings of a timetable response
+
+The full response repeats the course, faculty and room strings in every
+cell. ``compact_timetable`` stores each of them once, keyed by id, and
+lists the placed periods as flat rows; ``ndjson_lines`` streams the full
+response one class per line so clients can render as it arrives.
+"""
+from typing import Any, Dict, Iterator
+import json
+from .slot_masks import Calendar
+
+# Column order of each row in the compact "slots" array
+COMPACT_SLOT_FIELDS = ["class", "day", "period", "lesson_id", "course_id", "faculty_id", "classroom_id"]
+
+
+def compact_timetable(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Dictionary-encode a timetable response
+
+    ``class`` and ``day`` in each slot row index into ``classes`` and
+    ``days``; course, faculty and classroom ids key into their tables.
+    """
+    calendar = Calendar.from_dict(result.get("calendar"))
+    classes = list(result["timetable"])
+    courses: Dict[int, Dict[str, Any]] = {}
+    faculties: Dict[int, Dict[str, Any]] = {}
+    classrooms: Dict[int, Dict[str, Any]] = {}
+    slots = []
+    for class_index, schedule in enumerate(result["timetable"].values()):
+        for day_index, day in enumerate(calendar.days):
+            for period, cell in enumerate(schedule.get(day, [])):
+                if not cell:
+                    continue
+                course_id = cell.get("course_id")
+                faculty_id = cell.get("faculty_id")
+                classroom_id = cell.get("classroom_id")
+                if course_id not in courses:
+                    courses[course_id] = {
+                        "name": cell["course_name"],
+                        "abbreviation": cell["course_abbr"],
+                        "color": cell["color"],
+                    }
+                if faculty_id not in faculties:
+                    faculties[faculty_id] = {"name": cell["faculty_name"], "abbreviation": cell["faculty_abbr"]}
+                if classroom_id is not None and classroom_id not in classrooms:
+                    classrooms[classroom_id] = {"abbreviation": cell["classroom"]}
+                slots.append([class_index, day_index, period, cell["lesson_id"], course_id, faculty_id, classroom_id])
+    return {
+        "format": "compact",
+        "days": calendar.days,
+        "periods_per_day": calendar.periods_per_day,
+        "calendar": calendar.to_dict(),
+        "classes": classes,
+        "courses": courses,
+        "faculties": faculties,
+        "classrooms": classrooms,
+        "slot_fields": COMPACT_SLOT_FIELDS,
+        "slots": slots,
+        "pending": result["pending"],
+        "stats": result["stats"],
+        "version_id": result.get("version_id"),
+    }
+
+
+def ndjson_lines(result: Dict[str, Any]) -> Iterator[str]:
+    """Stream a timetable response: a header line, then one line per class"""
+    calendar = Calendar.from_dict(result.get("calendar"))
+    yield json.dumps({
+        "type": "header",
+        "days": calendar.days,
+        "periods_per_day": calendar.periods_per_day,
+        "calendar": calendar.to_dict(),
+        "classes": list(result["timetable"]),
+        "pending": result["pending"],
+        "stats": result["stats"],
+        "version_id": result.get("version_id"),
+    }) + "\n"
+    for class_name, schedule in result["timetable"].items():
+        yield json.dumps({"type": "class", "class": class_name, "timetable": schedule}) + "\n"
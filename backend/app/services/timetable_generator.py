@@ -1,153 +1,635 @@
-from typing import Dict, List, Any, Tuple
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
 from sqlalchemy.orm import Session
 import random
+import time
 from ..models.course import Course
 from ..models.class_model import Class
 from ..models.faculty import Faculty
 from ..models.lesson import Lesson
-from ..models.classroom import Classroom
+from .slot_masks import Calendar, block_mask, slot_list
+from .solvers import get_engine
+from .local_search import LocalSearch
+from .scoring import Scorer
+from .problem_data import ProblemData
+from .generation_metrics import INSTRUMENT_ALL, GenerationMetrics
+from ..database import DEFAULT_TENANT
+
+# Minimum seconds between two progress callbacks
+PROGRESS_INTERVAL = 0.25
+
+# Pending diagnostics: what each constraint means for an unplaced block
+CONSTRAINT_REASONS = {
+    "class_busy": "Class is busy in every remaining slot",
+    "same_day": "Lesson already has a block on the other days",
+    "faculty_busy": "Faculty or a co-teacher is teaching elsewhere",
+    "time_off": "Faculty or co-teacher time off",
+    "class_unavailable": "Class is unavailable (available_slots or blocked_slots)",
+    "course_unavailable": "Course is outside its available_slots",
+    "max_per_day": "Faculty max periods per day reached",
+    "no_room": "No free classroom of the required type",
+}
+
+
+class GenerationCancelled(Exception):
+    """Raised from a progress callback to abort a running generation"""
 
-# Constants
-DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-PERIODS_PER_DAY = 8
 
 class TimetableGenerator:
-    def __init__(self, db: Session):
+    def __init__(self, db: Optional[Session], progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 data: Optional[ProblemData] = None, seed: Optional[int] = None, instrument: bool = False,
+                 tenant_id: str = DEFAULT_TENANT):
+        # Either a session to load the tenant's master data from, or a preloaded
+        # snapshot (which carries its own tenant)
         self.db = db
+        self.data = data
+        self.tenant_id = data.tenant_id if data is not None else tenant_id
+        # Days and periods of the week, taken from the snapshot on load
+        self.calendar: Optional[Calendar] = None
+        # Every random choice of this run (engines and local search included)
+        # comes from self.rng. A seed reproduces placement exactly as long as no
+        # wall-clock limit cuts a phase short: the backtracking time_limit, or
+        # the local search time budget (use optimize_iterations instead)
+        self.seed = seed if seed is not None else random.randrange(2 ** 31)
+        self.rng = random.Random(self.seed)
+        # Counters and phase timings, only when instrumentation is on
+        self.metrics = GenerationMetrics() if instrument or INSTRUMENT_ALL else None
+        self.progress_callback = progress_callback
+        self.phase = "load"
+        self.placed_count = 0
+        self._started = time.perf_counter()
+        self._last_progress = 0.0
         self.timetable = {}
+        # Occupancy bitmasks over the week, see slot_masks. class_schedule is
+        # kept per timetable row (a class, or one of its batch groups)
+        self.class_schedule = {}
         self.faculty_schedule = {}
         self.classroom_schedule = {}
+        # Classroom ids per classroom_type, compiled availability, and the class
+        # holding each non-shared room (with how many blocks it has there)
+        self.rooms_by_type = {}
+        self.classroom_available = {}
+        self.classroom_owner = {}
+        self.classroom_uses = {}
+        # Per-faculty periods taught per day, and days already at max_periods_per_day
+        self.faculty_day_load = {}
+        self.faculty_full_days = {}
+        self.faculty_max_per_day = {}
+        self.faculty_time_off = {}
+        # Rows whose occupancy blocks each row: a class conflicts with all of
+        # its groups, a group only with the whole class
+        self.row_conflicts = {}
+        # Days (as slot masks) on which each lesson is already scheduled
+        self.lesson_days = {}
         self.pending_lessons = []
-        
-    def generate(self) -> Dict[str, Any]:
-        """Generate timetable for all classes"""
-        # Load all data
-        classes = self.db.query(Class).all()
-        lessons = self.db.query(Lesson).all()
-        courses = {c.id: c for c in self.db.query(Course).all()}
-        faculties = {f.id: f for f in self.db.query(Faculty).all()}
-        classrooms = self.db.query(Classroom).all()
-        
-        # Initialize timetable structure
-        for cls in classes:
-            class_name = f"{cls.name} {cls.division}" if cls.division else cls.name
-            self.timetable[class_name] = {day: [None] * PERIODS_PER_DAY for day in DAYS}
-            
+        self.engine_stats = {}
+        # Soft-constraint scorer of the finished timetable, set by _finish
+        self.scorer: Optional[Scorer] = None
+
+    def generate(self, engine: str = "greedy", optimize: bool = False, optimize_time_limit: float = 2.0,
+                 optimize_iterations: Optional[int] = None, weights: Optional[Dict[str, float]] = None, heavy_course_ids: Optional[List[int]] = None,
+                 **engine_options) -> Dict[str, Any]:
+        """Generate timetable for all classes
+
+        ``weights`` and ``heavy_course_ids`` configure the soft-constraint
+        score (see scoring) that local search minimizes and stats.score reports.
+        """
+        lessons = self._load()
+
+        # Place lessons with the requested solver engine
+        self._set_phase("place")
+        solver = get_engine(engine)(self, **engine_options)
+        self.engine_stats = solver.solve(lessons)
+
+        return self._finish(lessons, optimize, optimize_time_limit, optimize_iterations, weights, heavy_course_ids)
+
+    def reschedule(self, placements: List[Tuple[int, int, int, Optional[int]]], changed_lesson_ids: Set[int] = frozenset(),
+                   max_moves: int = 50, optimize: bool = False, optimize_time_limit: float = 2.0,
+                   optimize_iterations: Optional[int] = None,
+                   weights: Optional[Dict[str, float]] = None,
+                   heavy_course_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Repair a stored timetable after a small edit instead of regenerating it
+
+        ``placements`` are the stored (lesson_id, day_index, period, classroom_id)
+        slots; kept blocks stay in their room when it is still free.
+        Slots of changed lessons are ripped out, every other slot is kept
+        as long as it still satisfies the current constraints (so new
+        faculty time off or limits only evict the periods they conflict
+        with), and missing periods are re-placed. When a period has no
+        free slot, up to ``max_moves`` occupants in total are moved aside
+        to make room.
+        """
+        lessons = self._load()
+        self._set_phase("place")
+
+        # Regroup stored periods into blocks: consecutive periods of a lesson on one day.
+        # Periods the current calendar no longer has are displaced and re-placed
+        days = self.calendar.days
+        kept = ripped = displaced = 0
+        blocks = []
+        for lesson_id, day_index, period, classroom_id in sorted(placements, key=lambda p: (p[0], p[1], p[2])):
+            if day_index >= len(days) or period >= self.calendar.day_periods[day_index]:
+                displaced += 1
+                continue
+            last = blocks[-1] if blocks else None
+            if last and last[0] == lesson_id and last[1] == day_index and last[2] + last[3] == period:
+                last[3] += 1
+            else:
+                blocks.append([lesson_id, day_index, period, 1, classroom_id])
+
+        # Blocks each lesson still needs, consumed as stored blocks are kept
+        needed = {lesson.id: self._block_lengths(lesson) for lesson in lessons}
+        for lesson_id, day_index, period, length, classroom_id in blocks:
+            lesson = self.lessons_by_id.get(lesson_id)
+            resolved = self._resolve_lesson(lesson) if lesson else None
+            if not resolved or lesson_id in changed_lesson_ids or length not in needed[lesson_id]:
+                ripped += length
+                continue
+            course, faculty, _, class_name = resolved
+            if self._is_slot_valid(class_name, days[day_index], period, faculty, lesson, length):
+                self._assign_slot(class_name, days[day_index], period, lesson, course, faculty, length, classroom_id)
+                needed[lesson_id].remove(length)
+                kept += length
+            else:
+                displaced += length
+
+        # Re-place whatever is missing, heaviest lessons first
+        moves_left = max_moves
+        replaced = 0
+        for lesson in sorted(lessons, key=lambda l: l.periods_per_week, reverse=True):
+            resolved = self._resolve_lesson(lesson) if needed[lesson.id] else None
+            if not resolved:
+                continue
+            course, faculty, cls, class_name = resolved
+            for length in needed[lesson.id]:
+                slot = self._find_valid_slot(lesson, class_name, faculty, cls, length)
+                if slot:
+                    self._assign_slot(class_name, slot[0], slot[1], lesson, course, faculty, length)
+                    replaced += length
+                elif moves_left > 0 and length == 1 and self._place_by_moving(lesson, course, faculty, class_name):
+                    moves_left -= 1
+                    replaced += length
+                else:
+                    self._add_pending(lesson, course, faculty, class_name, length)
+
+        self.engine_stats = {
+            "engine": "incremental",
+            "kept": kept,
+            "ripped": ripped,
+            "displaced": displaced,
+            "replaced": replaced,
+            "moved": max_moves - moves_left,
+        }
+        return self._finish(lessons, optimize, optimize_time_limit, optimize_iterations, weights, heavy_course_ids)
+
+    def _load(self) -> List[Lesson]:
+        """Load master data and initialize the occupancy state, returning the lessons"""
+        self._started = time.perf_counter()
+        self._set_phase("load")
+
+        # One snapshot holds every lookup the placement loop needs. A snapshot
+        # read before the run still counts towards the load phase
+        if self.data is not None and self.metrics is not None:
+            self.metrics.add_phase_ms("load", self.data.load_ms)
+        data = self.data = self.data or ProblemData.load(self.db, self.tenant_id)
+        calendar = self.calendar = data.calendar
+        self.courses = data.course_by_id
+        self.faculties = data.faculty_by_id
+        self.classrooms = data.classroom_by_id
+        self.lessons_by_id = data.lesson_by_id
+        self.faculty_time_off = data.faculty_time_off
+        self.faculty_max_per_day = data.faculty_max_per_day
+        self.classroom_available = data.classroom_available
+        self.rooms_by_type = data.rooms_by_type
+        self.lesson_faculty_ids = data.lesson_faculty_ids
+        self.lesson_blocked = data.lesson_blocked
+
+        # Initialize timetable structure, each class followed by its batch groups
+        for class_name in data.class_names.values():
+            groups = data.group_rows[class_name]
+            self.row_conflicts[class_name] = (class_name, *groups)
+            for row in (class_name, *groups):
+                self.timetable[row] = {day: [None] * count for day, count in zip(calendar.days, calendar.day_periods)}
+                self.class_schedule[row] = 0
+            for row in groups:
+                self.row_conflicts[row] = (row, class_name)
+
         # Initialize faculty schedule
-        for faculty in faculties.values():
-            self.faculty_schedule[faculty.id] = {day: [False] * PERIODS_PER_DAY for day in DAYS}
-            
+        for faculty_id, max_per_day in data.faculty_max_per_day.items():
+            self.faculty_schedule[faculty_id] = 0
+            self.faculty_day_load[faculty_id] = [0] * len(calendar.days)
+            self.faculty_full_days[faculty_id] = calendar.full_week_mask if max_per_day <= 0 else 0
+
         # Initialize classroom schedule
-        for classroom in classrooms:
-            self.classroom_schedule[classroom.id] = {day: [False] * PERIODS_PER_DAY for day in DAYS}
-        
-        # Sort lessons by priority (more periods_per_week = higher priority)
-        sorted_lessons = sorted(lessons, key=lambda l: l.periods_per_week, reverse=True)
-        
-        # Place lessons
-        for lesson in sorted_lessons:
-            self._place_lesson(lesson, courses, faculties, classes)
-        
+        for room_id in data.classroom_by_id:
+            self.classroom_schedule[room_id] = 0
+            self.classroom_uses[room_id] = 0
+
+        return list(data.lessons)
+
+    def _finish(self, lessons: List[Lesson], optimize: bool, optimize_time_limit: float,
+                optimize_iterations: Optional[int] = None,
+                weights: Optional[Dict[str, float]] = None,
+                heavy_course_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Run the optional improvement phase and build the response"""
+        self.scorer = Scorer(self, weights, heavy_course_ids)
+
+        # Optional local-search improvement of the engine's result
+        if optimize:
+            self._set_phase("optimize")
+            search = LocalSearch(self, lessons, optimize_time_limit, self.scorer, optimize_iterations)
+            self.engine_stats["local_search"] = search.run()
+
         # Build response
-        return self._build_response(courses, faculties)
-    
-    def _place_lesson(self, lesson: Lesson, courses: Dict, faculties: Dict, classes: List):
+        self._set_phase("build_response")
+        response = self._build_response(self.courses, self.faculties)
+        response["stats"]["score"] = self.scorer.breakdown()
+        self._set_phase("done")
+        if self.metrics is not None:
+            response["stats"]["metrics"] = self.metrics.to_dict()
+        return response
+
+    def _place_by_moving(self, lesson: Lesson, course: Course, faculty: Faculty, class_name: str) -> bool:
+        """Place one period by moving a single occupant block of the class to another free slot"""
+        occupied = slot_list(self.class_schedule[class_name])
+        self.rng.shuffle(occupied)
+        for slot in occupied:
+            day_index, period = self.calendar.split_slot(slot)
+            day = self.calendar.days[day_index]
+            occupant = self.timetable[class_name][day][period]
+            other = self.lessons_by_id.get(occupant["lesson_id"])
+            other_faculty = self.faculties.get(other.faculty_id) if other else None
+            if other_faculty is None:
+                continue
+            first, length = self._block_at(class_name, day_index, period)
+            other_course = self.courses[other.course_id]
+
+            self._unassign_slot(class_name, day, first, other, other_faculty, length)
+            if self._is_slot_valid(class_name, day, period, faculty, lesson):
+                self._assign_slot(class_name, day, period, lesson, course, faculty)
+                new_home = self._find_valid_slot(other, class_name, other_faculty, None, length)
+                if new_home:
+                    self._assign_slot(class_name, new_home[0], new_home[1], other, other_course, other_faculty, length)
+                    return True
+                self._unassign_slot(class_name, day, period, lesson, faculty)
+            self._assign_slot(class_name, day, first, other, other_course, other_faculty, length)
+        return False
+
+    def _set_phase(self, phase: str):
+        self.phase = phase
+        if self.metrics is not None:
+            self.metrics.start_phase(phase)
+        self._report_progress(force=True)
+
+    def _report_progress(self, force: bool = False):
+        """Send a throttled progress snapshot to the progress callback, if any"""
+        if not self.progress_callback:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        self.progress_callback({
+            "phase": self.phase,
+            "lessons_placed": self.placed_count,
+            "pending": len(self.pending_lessons),
+            "elapsed_ms": round((now - self._started) * 1000, 2),
+        })
+
+    def _resolve_lesson(self, lesson: Lesson) -> Optional[Tuple[Course, Faculty, Class, str]]:
+        """Look up course, faculty, class and class name for a lesson"""
+        return self.data.lesson_refs.get(lesson.id)
+
+    def _block_lengths(self, lesson: Lesson) -> List[int]:
+        """Split periods_per_week into blocks of ``duration`` consecutive periods
+
+        A remainder that does not fill a whole block becomes one shorter block.
+        """
+        duration = max(1, min(lesson.duration or 1, self.calendar.periods_per_day))
+        blocks, remainder = divmod(lesson.periods_per_week or 0, duration)
+        return [duration] * blocks + ([remainder] if remainder else [])
+
+    def _place_lesson(self, lesson: Lesson):
         """Try to place a lesson in the timetable"""
-        course = courses.get(lesson.course_id)
-        faculty = faculties.get(lesson.faculty_id)
-        cls = next((c for c in classes if c.id == lesson.class_id), None)
-        
-        if not course or not faculty or not cls:
+        resolved = self._resolve_lesson(lesson)
+        if not resolved:
             return
-        
-        class_name = f"{cls.name} {cls.division}" if cls.division else cls.name
-        placed_count = 0
-        
-        # Try to place periods_per_week instances of this lesson
-        for _ in range(lesson.periods_per_week):
-            slot = self._find_valid_slot(lesson, class_name, faculty, cls)
+        course, faculty, cls, class_name = resolved
+
+        # Place every block of this lesson on a different day
+        for length in self._block_lengths(lesson):
+            slot = self._find_valid_slot(lesson, class_name, faculty, cls, length)
             if slot:
                 day, period = slot
-                self._assign_slot(class_name, day, period, lesson, course, faculty)
-                placed_count += 1
+                self._assign_slot(class_name, day, period, lesson, course, faculty, length)
+            else:
+                self._add_pending(lesson, course, faculty, class_name, length)
+
+    def _add_pending(self, lesson: Lesson, course: Course, faculty: Faculty, class_name: str, length: int = 1):
+        """Record one block of a lesson that could not be placed
+
+        Entries stay minimal while searching; _pending_report aggregates and
+        explains them once the timetable is final.
+        """
+        self.pending_lessons.append({"lesson_id": lesson.id, "periods": length})
+        if self.metrics is not None:
+            self.metrics.count("pending")
+        self._report_progress()
+
+    def _pending_report(self) -> List[Dict[str, Any]]:
+        """Pending blocks aggregated per lesson, with the constraints keeping them out"""
+        lengths_by_lesson: Dict[int, List[int]] = {}
+        for entry in self.pending_lessons:
+            lengths_by_lesson.setdefault(entry["lesson_id"], []).append(entry["periods"])
+
+        report = []
+        for lesson_id, lengths in lengths_by_lesson.items():
+            lesson = self.lessons_by_id[lesson_id]
+            course, faculty, _, class_name = self._resolve_lesson(lesson)
+            constraints = self._diagnose(class_name, faculty, lesson, min(lengths))
+            binding = [c["constraint"] for c in constraints if c["binding"]]
+            if binding:
+                reason = "; ".join(CONSTRAINT_REASONS[name] for name in binding)
+            elif constraints:
+                reason = "No slot satisfies all constraints together"
             else:
-                # Add to pending
-                self.pending_lessons.append({
-                    "lesson_id": lesson.id,
-                    "course": course.title,
-                    "class": class_name,
-                    "faculty": f"{faculty.first_name} {faculty.last_name}",
-                    "reason": "No valid slot found"
+                reason = "A valid slot exists, but the search did not use it"
+            report.append({
+                "lesson_id": lesson_id,
+                "course": course.title,
+                "class": class_name,
+                "faculty": self.data.faculty_names[faculty.id],
+                "periods": sum(lengths),
+                "blocks": sorted(lengths, reverse=True),
+                "reason": reason,
+                "constraints": constraints,
+            })
+        return report
+
+    def _diagnose(self, class_name: str, faculty: Faculty, lesson: Lesson, length: int) -> List[Dict[str, Any]]:
+        """How each constraint restricts the starts of a block in the final timetable
+
+        ``blocked_starts`` counts the block starts a constraint rules out on
+        its own; it is ``binding`` when lifting just that constraint would
+        leave some start open. Binding constraints come first.
+        """
+        calendar = self.calendar
+        blockers = self._slot_blockers(class_name, faculty, lesson, length)
+        rooms = self._candidate_rooms(class_name, lesson)
+        room_starts = None
+        if rooms is not None:
+            room_starts = 0
+            for room_id in rooms:
+                room_starts |= calendar.block_starts(self._room_free(room_id), length)
+
+        constraints = []
+        for name, blocked in blockers:
+            others = 0
+            for other, mask in blockers:
+                if other != name:
+                    others |= mask
+            opened = calendar.block_starts(calendar.full_week_mask & ~others, length)
+            if room_starts is not None:
+                opened &= room_starts
+            ruled_out = calendar.block_start_masks[length] & ~calendar.block_starts(
+                calendar.full_week_mask & ~blocked, length
+            )
+            if ruled_out:
+                constraints.append({
+                    "constraint": name,
+                    "blocked_starts": bin(ruled_out).count("1"),
+                    "binding": bool(opened),
+                })
+        if room_starts is not None:
+            ruled_out = calendar.block_start_masks[length] & ~room_starts
+            if ruled_out:
+                everything = 0
+                for _, mask in blockers:
+                    everything |= mask
+                constraints.append({
+                    "constraint": "no_room",
+                    "blocked_starts": bin(ruled_out).count("1"),
+                    "binding": bool(calendar.block_starts(calendar.full_week_mask & ~everything, length)),
                 })
-        
-    def _find_valid_slot(self, lesson: Lesson, class_name: str, faculty: Faculty, cls: Class) -> Tuple[str, int]:
-        """Find a valid slot for a lesson"""
-        # Get faculty constraints
-        faculty_constraints = faculty.constraints or {}
-        max_periods_per_day = faculty_constraints.get("max_periods_per_day", PERIODS_PER_DAY)
-        time_off = faculty.time_off or []
-        
-        # Create list of all possible slots
-        possible_slots = []
-        for day in DAYS:
-            for period in range(PERIODS_PER_DAY):
-                if self._is_slot_valid(class_name, day, period, faculty, lesson, max_periods_per_day, time_off):
-                    possible_slots.append((day, period))
-        
-        # Shuffle for randomization
-        random.shuffle(possible_slots)
-        
-        # Return first valid slot, or None
-        return possible_slots[0] if possible_slots else None
-    
-    def _is_slot_valid(self, class_name: str, day: str, period: int, faculty: Faculty, 
-                       lesson: Lesson, max_periods_per_day: int, time_off: List) -> bool:
-        """Check if a slot is valid for placement"""
-        # Check if slot is already occupied in class timetable
-        if self.timetable[class_name][day][period] is not None:
-            return False
-        
-        # Check if faculty is available
-        if self.faculty_schedule[faculty.id][day][period]:
-            return False
-        
-        # Check faculty time off
-        slot_key = f"{day}-{period}"
-        if slot_key in time_off:
-            return False
-        
-        # Check max periods per day for faculty
-        faculty_periods_today = sum(self.faculty_schedule[faculty.id][day])
-        if faculty_periods_today >= max_periods_per_day:
-            return False
-        
-        # Check if same course already scheduled this day
-        course_today = any(
-            slot and slot.get("lesson_id") == lesson.id 
-            for slot in self.timetable[class_name][day] 
-            if slot
-        )
-        if course_today and lesson.duration == 1:
-            return False
-        
-        return True
-    
-    def _assign_slot(self, class_name: str, day: str, period: int, lesson: Lesson, 
-                     course: Course, faculty: Faculty):
-        """Assign a lesson to a slot"""
+        constraints.sort(key=lambda c: (not c["binding"], -c["blocked_starts"]))
+        return constraints
+
+    def _find_valid_slot(self, lesson: Lesson, class_name: str, faculty: Faculty, cls: Optional[Class],
+                         length: int = 1) -> Optional[Tuple[str, int]]:
+        """Find a valid (day, first period) for a block of the lesson"""
+        possible_slots = slot_list(self._valid_slot_mask(class_name, faculty, lesson, length))
+
+        # Return a random valid slot, or None
+        if not possible_slots:
+            return None
+        day_index, period = self.calendar.split_slot(self.rng.choice(possible_slots))
+        return self.calendar.days[day_index], period
+
+    def _valid_slot_mask(self, class_name: str, faculty: Faculty, lesson: Lesson, length: int = 1) -> int:
+        """Bitmask of every slot where a block of ``length`` periods can start right now"""
+        class_busy = self._class_busy(class_name)
+        # Each block of a lesson goes on a different day
+        same_day = self.lesson_days.get(lesson.id, 0)
+        # Every co-teacher must be free too
+        faculty_busy, day_limit = self._faculty_masks(lesson, length)
+        # Time off and class/course availability, compiled into one mask per lesson
+        unavailable = self.lesson_blocked[lesson.id]
+        blocked = class_busy | same_day | faculty_busy | unavailable | day_limit
+        calendar = self.calendar
+        starts = calendar.block_starts(calendar.full_week_mask & ~blocked, length)
+
+        # Some room of the lesson's type must be free for the whole block
+        rooms = self._candidate_rooms(class_name, lesson)
+        room_starts = None
+        if starts and rooms is not None:
+            room_starts = 0
+            for room_id in rooms:
+                room_starts |= calendar.block_starts(self._room_free(room_id), length)
+            starts &= room_starts
+
+        if self.metrics is not None:
+            self.metrics.record_mask(calendar, length, self._slot_blockers(class_name, faculty, lesson, length), room_starts)
+        return starts
+
+    def _class_busy(self, class_name: str) -> int:
+        """Slots taken in a timetable row or in any row it cannot run in parallel with"""
+        rows = self.row_conflicts[class_name]
+        if len(rows) == 1:
+            return self.class_schedule[class_name]
+        busy = 0
+        for row in rows:
+            busy |= self.class_schedule[row]
+        return busy
+
+    def _faculty_masks(self, lesson: Lesson, length: int) -> Tuple[int, int]:
+        """(busy, max_per_day) masks combined over every faculty teaching the lesson"""
+        faculty_ids = self.lesson_faculty_ids[lesson.id]
+        if len(faculty_ids) == 1:
+            return self.faculty_schedule[faculty_ids[0]], self._day_limit_mask(faculty_ids[0], length)
+        busy = day_limit = 0
+        for faculty_id in faculty_ids:
+            busy |= self.faculty_schedule[faculty_id]
+            day_limit |= self._day_limit_mask(faculty_id, length)
+        return busy, day_limit
+
+    def _day_limit_mask(self, faculty_id: int, length: int) -> int:
+        """Days where a block of ``length`` would push the faculty past max_periods_per_day"""
+        if length == 1:
+            return self.faculty_full_days[faculty_id]
+        day_limit = 0
+        limit = self.faculty_max_per_day[faculty_id] - length
+        for day_index, load in enumerate(self.faculty_day_load[faculty_id]):
+            if load > limit:
+                day_limit |= self.calendar.day_masks[day_index]
+        return day_limit
+
+    def _slot_blockers(self, class_name: str, faculty: Faculty, lesson: Lesson, length: int) -> List[Tuple[str, int]]:
+        """The masks _valid_slot_mask combines, named by constraint"""
+        faculty_busy, day_limit = self._faculty_masks(lesson, length)
+        return [
+            ("class_busy", self._class_busy(class_name)),
+            ("same_day", self.lesson_days.get(lesson.id, 0)),
+            ("faculty_busy", faculty_busy),
+            ("time_off", self.data.lesson_time_off[lesson.id]),
+            ("class_unavailable", self.data.class_unavailable[lesson.class_id]),
+            ("course_unavailable", self.data.course_unavailable[lesson.course_id]),
+            ("max_per_day", day_limit),
+        ]
+
+    def _candidate_rooms(self, class_name: str, lesson: Lesson) -> Optional[List[int]]:
+        """Rooms of the lesson's classroom_type this class may use, its own rooms first
+
+        None means no room of that type exists, so rooms do not constrain
+        the lesson and it is shown as "TBD".
+        """
+        rooms = self.rooms_by_type.get(lesson.classroom_type or "regular")
+        if not rooms:
+            return None
+        # Batch groups share their class's rooms
+        class_name = self.data.row_class[class_name]
+        own, other = [], []
+        for room_id in rooms:
+            owner = self.classroom_owner.get(room_id)
+            if owner == class_name:
+                own.append(room_id)
+            elif owner is None:
+                other.append(room_id)
+        return own + other
+
+    def _room_free(self, room_id: int) -> int:
+        return self.classroom_available[room_id] & ~self.classroom_schedule[room_id]
+
+    def _pick_room(self, class_name: str, lesson: Lesson, bits: int,
+                   preferred: Optional[int] = None) -> Optional[int]:
+        """First usable room free over ``bits``, trying ``preferred`` first"""
+        rooms = self._candidate_rooms(class_name, lesson)
+        if rooms is None:
+            return None
+        if preferred in rooms:
+            rooms = [preferred] + rooms
+        for room_id in rooms:
+            if self._room_free(room_id) & bits == bits:
+                return room_id
+        return None
+
+    def _is_slot_valid(self, class_name: str, day: str, period: int, faculty: Faculty,
+                       lesson: Lesson, length: int = 1) -> bool:
+        """Check if a block can start at a slot"""
+        slot = self.calendar.slot_bit(self.calendar.day_index[day], period)
+        return bool(self._valid_slot_mask(class_name, faculty, lesson, length) & slot)
+
+    def _assign_slot(self, class_name: str, day: str, period: int, lesson: Lesson,
+                     course: Course, faculty: Faculty, length: int = 1, classroom_id: Optional[int] = None):
+        """Assign a block of the lesson starting at a slot
+
+        A free room of the lesson's type is picked, preferring ``classroom_id``.
+        """
+        day_index = self.calendar.day_index[day]
+        day_mask = self.calendar.day_masks[day_index]
+        bits = block_mask(self.calendar.slot_index(day_index, period), length)
+        room_id = self._pick_room(class_name, lesson, bits, classroom_id)
+        room = self.classrooms.get(room_id)
+        faculty_ids = self.lesson_faculty_ids[lesson.id]
+
         slot_data = {
             "lesson_id": lesson.id,
+            "course_id": course.id,
+            "faculty_id": faculty.id,
+            "shared_faculty_ids": list(faculty_ids[1:]),
             "course_name": course.title,
             "course_abbr": course.abbreviation,
-            "faculty_name": f"{faculty.first_name} {faculty.last_name}",
+            "faculty_name": self.data.faculty_names[faculty.id],
             "faculty_abbr": faculty.abbreviation,
-            "classroom": "TBD",  # Can be enhanced with classroom allocation
+            "classroom": room.abbreviation if room else "TBD",
+            "classroom_id": room_id,
             "color": course.color
         }
-        
-        self.timetable[class_name][day][period] = slot_data
-        self.faculty_schedule[faculty.id][day][period] = True
-    
+
+        if room:
+            self.classroom_schedule[room_id] |= bits
+            self.classroom_uses[room_id] += 1
+            if not room.is_shared:
+                self.classroom_owner[room_id] = self.data.row_class[class_name]
+        day_periods = self.timetable[class_name][day]
+        for p in range(period, period + length):
+            day_periods[p] = slot_data
+        self.class_schedule[class_name] |= bits
+        self.lesson_days[lesson.id] = self.lesson_days.get(lesson.id, 0) | day_mask
+
+        # Reserve every co-teacher together
+        for faculty_id in faculty_ids:
+            self.faculty_schedule[faculty_id] |= bits
+            load = self.faculty_day_load[faculty_id]
+            load[day_index] += length
+            if load[day_index] >= self.faculty_max_per_day[faculty_id]:
+                self.faculty_full_days[faculty_id] |= day_mask
+
+        self.placed_count += length
+        if self.metrics is not None:
+            self.metrics.count("assignments")
+        self._report_progress()
+
+    def _unassign_slot(self, class_name: str, day: str, period: int, lesson: Lesson, faculty: Faculty,
+                       length: int = 1):
+        """Remove a block starting at a slot, undoing _assign_slot"""
+        day_index = self.calendar.day_index[day]
+        day_mask = self.calendar.day_masks[day_index]
+        bits = block_mask(self.calendar.slot_index(day_index, period), length)
+        day_periods = self.timetable[class_name][day]
+        room_id = day_periods[period]["classroom_id"]
+        if room_id is not None:
+            self.classroom_schedule[room_id] &= ~bits
+            self.classroom_uses[room_id] -= 1
+            if not self.classroom_uses[room_id]:
+                self.classroom_owner.pop(room_id, None)
+        for p in range(period, period + length):
+            day_periods[p] = None
+        self.class_schedule[class_name] &= ~bits
+        if not any(slot and slot["lesson_id"] == lesson.id for slot in day_periods):
+            self.lesson_days[lesson.id] = self.lesson_days.get(lesson.id, 0) & ~day_mask
+
+        for faculty_id in self.lesson_faculty_ids[lesson.id]:
+            self.faculty_schedule[faculty_id] &= ~bits
+            load = self.faculty_day_load[faculty_id]
+            load[day_index] -= length
+            if load[day_index] < self.faculty_max_per_day[faculty_id]:
+                self.faculty_full_days[faculty_id] &= ~day_mask
+
+        self.placed_count -= length
+        if self.metrics is not None:
+            self.metrics.count("unassignments")
+
+    def _block_at(self, class_name: str, day_index: int, period: int) -> Tuple[int, int]:
+        """(first period, length) of the block covering a class slot"""
+        day_periods = self.timetable[class_name][self.calendar.days[day_index]]
+        lesson_id = day_periods[period]["lesson_id"]
+        first = period
+        while first > 0 and day_periods[first - 1] and day_periods[first - 1]["lesson_id"] == lesson_id:
+            first -= 1
+        last = period
+        while last + 1 < len(day_periods) and day_periods[last + 1] and day_periods[last + 1]["lesson_id"] == lesson_id:
+            last += 1
+        return first, last - first + 1
+
     def _build_response(self, courses: Dict, faculties: Dict) -> Dict[str, Any]:
         """Build the final response"""
         # Convert None to empty string for frontend
@@ -157,25 +639,28 @@ class TimetableGenerator:
                 day: [slot if slot else "" for slot in periods]
                 for day, periods in schedule.items()
             }
-        
+
         stats = {
             "total_classes": len(self.timetable),
-            "total_lessons_placed": sum(
-                sum(1 for slot in day_periods if slot)
-                for schedule in self.timetable.values()
-                for day_periods in schedule.values()
-            ),
-            "total_pending": len(self.pending_lessons)
+            "total_lessons_placed": sum(bin(mask).count("1") for mask in self.class_schedule.values()),
+            "total_pending": sum(entry["periods"] for entry in self.pending_lessons),
+            "seed": self.seed,
+            **self.engine_stats
         }
-        
+
         return {
             "timetable": formatted_timetable,
-            "pending": self.pending_lessons,
-            "stats": stats
+            "pending": self._pending_report(),
+            "stats": stats,
+            "calendar": self.calendar.to_dict(),
         }
 
 
-def generate_timetable(db: Session) -> Dict[str, Any]:
-    """Main function to generate timetable"""
-    generator = TimetableGenerator(db)
-    return generator.generate()
+def generate_timetable(db: Session, engine: str = "greedy",
+                       progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                       seed: Optional[int] = None, instrument: bool = False, data: Optional[ProblemData] = None,
+                       tenant_id: str = DEFAULT_TENANT, **options) -> Dict[str, Any]:
+    """Generate the timetable of one tenant, from ``data`` when given or else read from ``db``"""
+    generator = TimetableGenerator(db, progress_callback, data=data, seed=seed, instrument=instrument,
+                                   tenant_id=tenant_id)
+    return generator.generate(engine, **options)
@@ -0,0 +1,240 @@
+"""Persistence of generated timetables as versioned, indexed slot rows"""
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from ..database import DEFAULT_TENANT
+from ..models.class_model import Class
+from ..models.lesson import Lesson
+from ..models.timetable import TimetableVersion, TimetableSlot
+from .slot_masks import Calendar
+from .timetable_generator import TimetableGenerator, generate_timetable
+from .multi_start import generate_multi_start
+from .problem_data import ProblemData, class_label
+from .result_cache import cache_key, result_cache
+
+
+def generate_and_store(db: Session, options: Dict[str, Any],
+                       progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                       tenant_id: str = DEFAULT_TENANT) -> Dict[str, Any]:
+    """Run the generator over a tenant's data with request options and persist the result when save is set
+
+    Seeded requests identical to an earlier one over unchanged master data
+    are answered from the result cache, with ``stats.cached`` set; a cached
+    result is saved again only if its stored version has been deleted.
+    """
+    options = dict(options)
+    engine = options.pop("engine", "greedy")
+    save = options.pop("save", True)
+    label = options.pop("label", None)
+
+    if options.get("runs", 1) <= 1:
+        for key in ("runs", "workers", "score"):
+            options.pop(key, None)
+
+    data = ProblemData.load(db, tenant_id)
+    # Without a seed every request draws a new timetable, so none is cached
+    key = cache_key(data, engine, options) if options.get("seed") is not None else None
+    result = result_cache.get(key) if key is not None else None
+    if result is not None:
+        if save and not _version_exists(db, result.get("version_id"), tenant_id):
+            _save_result(db, result, engine, options, label, tenant_id)
+            result_cache.put(key, result)
+        result["stats"]["cached"] = True
+        return result
+
+    if options.get("runs", 1) > 1:
+        result = generate_multi_start(db, engine, progress_callback=progress_callback, data=data,
+                                      tenant_id=tenant_id, **options)
+    else:
+        result = generate_timetable(db, engine, progress_callback=progress_callback, data=data,
+                                    tenant_id=tenant_id, **options)
+    if save:
+        _save_result(db, result, engine, options, label, tenant_id)
+    if key is not None:
+        result_cache.put(key, result)
+    return result
+
+
+def _save_result(db: Session, result: Dict[str, Any], engine: str, options: Dict[str, Any], label: Optional[str],
+                 tenant_id: str):
+    # Record the seed actually used so the stored options reproduce the run
+    stats = result["stats"]
+    options = dict(options, seed=stats["multi_start"]["base_seed"] if "multi_start" in stats else stats["seed"])
+    version = save_timetable(db, result, {"engine": engine, **options}, label, tenant_id=tenant_id)
+    result["version_id"] = version.id
+
+
+def _version_exists(db: Session, version_id: Optional[int], tenant_id: str) -> bool:
+    if version_id is None:
+        return False
+    query = db.query(TimetableVersion.id).filter(TimetableVersion.id == version_id)
+    return query.filter(TimetableVersion.tenant_id == tenant_id).first() is not None
+
+
+def reschedule_and_store(db: Session, base: TimetableVersion, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Incrementally repair a stored version after edits and persist the result when save is set"""
+    options = dict(options)
+    save = options.pop("save", True)
+    label = options.pop("label", None)
+    changed_lesson_ids = set(options.pop("lesson_ids", []))
+    seed = options.pop("seed", None)
+    instrument = options.pop("instrument", False)
+
+    # Co-taught periods are stored once per faculty; read each period once
+    placements = (
+        db.query(TimetableSlot.lesson_id, TimetableSlot.day, TimetableSlot.period, TimetableSlot.classroom_id)
+        .filter(TimetableSlot.version_id == base.id)
+        .distinct()
+        .order_by(TimetableSlot.lesson_id, TimetableSlot.day, TimetableSlot.period)
+        .all()
+    )
+    data = ProblemData.load(db, base.tenant_id)
+    generator = TimetableGenerator(db, data=data, seed=seed, instrument=instrument)
+    result = generator.reschedule([tuple(row) for row in placements], changed_lesson_ids, **options)
+    result["stats"]["base_version_id"] = base.id
+    if save:
+        options = {"engine": "incremental", "lesson_ids": sorted(changed_lesson_ids), "seed": generator.seed, **options}
+        version = save_timetable(db, result, options, label, parent=base)
+        result["version_id"] = version.id
+    return result
+
+
+def save_timetable(db: Session, result: Dict[str, Any], options: Optional[Dict[str, Any]] = None,
+                   label: Optional[str] = None, parent: Optional[TimetableVersion] = None,
+                   tenant_id: str = DEFAULT_TENANT) -> TimetableVersion:
+    """Store a generator result as a new version with one row per placed period
+
+    A rescheduled version belongs to its parent's tenant.
+    """
+    calendar = Calendar.from_dict(result.get("calendar"))
+    version = TimetableVersion(
+        tenant_id=parent.tenant_id if parent else tenant_id,
+        label=label,
+        parent_id=parent.id if parent else None,
+        options=options or {},
+        stats=result["stats"],
+        pending=result["pending"],
+        class_names=list(result["timetable"].keys()),
+        calendar=calendar.to_dict(),
+    )
+    db.add(version)
+    db.flush()
+
+    lesson_ids = {
+        cell["lesson_id"]
+        for schedule in result["timetable"].values()
+        for periods in schedule.values()
+        for cell in periods
+        if cell
+    }
+    lessons = {}
+    if lesson_ids:
+        lessons = {
+            row.id: row
+            for row in db.query(Lesson.id, Lesson.class_id, Lesson.course_id, Lesson.faculty_id)
+            .filter(Lesson.id.in_(lesson_ids))
+        }
+
+    rows = []
+    for class_name, schedule in result["timetable"].items():
+        for day_index, day in enumerate(calendar.days):
+            for period, cell in enumerate(schedule.get(day, [])):
+                lesson = lessons.get(cell["lesson_id"]) if cell else None
+                if not lesson:
+                    continue
+                # One row per teaching faculty, so co-teachers' views find the period
+                # through the faculty index; the rows of one cell are identical otherwise
+                for faculty_id in [lesson.faculty_id, *cell.get("shared_faculty_ids", [])]:
+                    rows.append({
+                        "version_id": version.id,
+                        "day": day_index,
+                        "period": period,
+                        "lesson_id": lesson.id,
+                        "class_id": lesson.class_id,
+                        "class_name": class_name,
+                        "course_id": lesson.course_id,
+                        "faculty_id": faculty_id,
+                        "classroom_id": cell.get("classroom_id"),
+                        "data": cell,
+                    })
+    if rows:
+        db.execute(insert(TimetableSlot), rows)
+    db.commit()
+    db.refresh(version)
+    return version
+
+
+def latest_version(db: Session, tenant_id: str = DEFAULT_TENANT) -> Optional[TimetableVersion]:
+    return (
+        db.query(TimetableVersion)
+        .filter(TimetableVersion.tenant_id == tenant_id)
+        .order_by(TimetableVersion.id.desc())
+        .first()
+    )
+
+
+def version_response(version: TimetableVersion, slots: List[TimetableSlot],
+                     class_names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Rebuild the generator's response shape from stored slot rows"""
+    # Versions stored before calendars were configurable used the default week
+    calendar = Calendar.from_dict(version.calendar)
+
+    def empty_week() -> Dict[str, List[Any]]:
+        return {day: calendar.empty_day(d) for d, day in enumerate(calendar.days)}
+
+    timetable = {
+        class_name: empty_week()
+        for class_name in (version.class_names if class_names is None else class_names)
+    }
+    for slot in slots:
+        schedule = timetable.setdefault(slot.class_name, empty_week())
+        data = slot.data
+        if "course_id" not in data:
+            # Versions stored before cells carried their ids
+            data = {**data, "course_id": slot.course_id, "faculty_id": slot.faculty_id}
+        schedule[calendar.days[slot.day]][slot.period] = data
+    return {
+        "timetable": timetable,
+        "pending": version.pending,
+        "stats": version.stats,
+        "calendar": calendar.to_dict(),
+        "version_id": version.id,
+    }
+
+
+def load_timetable(db: Session, version: TimetableVersion) -> Dict[str, Any]:
+    slots = db.query(TimetableSlot).filter(TimetableSlot.version_id == version.id).all()
+    return version_response(version, slots)
+
+
+def load_class_timetable(db: Session, version: TimetableVersion, cls: Class) -> Dict[str, Any]:
+    """Timetable of a single class, read through the (version_id, class_id) index"""
+    slots = (
+        db.query(TimetableSlot)
+        .filter(TimetableSlot.version_id == version.id, TimetableSlot.class_id == cls.id)
+        .all()
+    )
+    result = version_response(version, slots, class_names=[class_label(cls)])
+    result["pending"] = [p for p in version.pending if p.get("class") in result["timetable"]]
+    return result
+
+
+def load_entity_timetable(db: Session, version: TimetableVersion, column, entity_id: int) -> Dict[str, Any]:
+    """Week grid of the slots one faculty or classroom has in a version
+
+    ``column`` is TimetableSlot.faculty_id or TimetableSlot.classroom_id, so
+    the read goes through the matching (version_id, ...) index and costs
+    time in proportion to that entity's periods only.
+    """
+    slots = (
+        db.query(TimetableSlot.day, TimetableSlot.period, TimetableSlot.class_name, TimetableSlot.data)
+        .filter(TimetableSlot.version_id == version.id, column == entity_id)
+        .all()
+    )
+    calendar = Calendar.from_dict(version.calendar)
+    timetable = {day: calendar.empty_day(d) for d, day in enumerate(calendar.days)}
+    for day, period, class_name, data in slots:
+        timetable[calendar.days[day]][period] = {**data, "class_name": class_name}
+    # Co-taught periods are stored once per faculty, so count cells rather than rows
+    total_periods = sum(1 for periods in timetable.values() for cell in periods if cell)
+    return {"version_id": version.id, "timetable": timetable, "total_periods": total_periods}
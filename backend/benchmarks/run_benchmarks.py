@@ -0,0 +1,141 @@
+"""Benchmark the timetable generator across school sizes and engines
+
+Run from the backend directory:
+
+    python -m benchmarks.run_benchmarks --sizes small medium --engines greedy backtracking
+
+Each (size, engine) pair is generated ``--repeat`` times with seeds
+``--seed``, ``--seed + 1``, ...; one row per run is written as CSV or JSON
+lines so results can be diffed across releases.
+"""
+from typing import Any, Dict, List
+import argparse
+import csv
+import json
+import sys
+import time
+import tracemalloc
+from app.services.problem_data import ProblemData
+from app.services.timetable_generator import TimetableGenerator, generate_timetable
+from .synthetic_school import SIZES, build_session, build_snapshot
+
+COLUMNS = [
+    "size", "engine", "seed", "source", "classes", "faculties", "classrooms", "lessons", "periods",
+    "wall_ms", "peak_kb", "placed", "pending_periods", "placement_rate",
+]
+
+
+def run_once(size: str, spec: Dict[str, Any], engine: str, seed: int, source: str,
+             options: Dict[str, Any], memory: bool = True) -> Dict[str, Any]:
+    """Generate one synthetic school and measure the run"""
+    if source == "db":
+        db = build_session(**spec)
+        data = None
+    else:
+        db = None
+        data = build_snapshot(**spec)
+
+    def generate() -> Dict[str, Any]:
+        if db is not None:
+            return generate_timetable(db, engine, seed=seed, **options)
+        return TimetableGenerator(None, data=data, seed=seed).generate(engine, **options)
+
+    # Time an untraced run, then repeat it under tracemalloc for peak memory,
+    # since tracing slows allocation-heavy code down considerably
+    started = time.perf_counter()
+    result = generate()
+    wall_ms = (time.perf_counter() - started) * 1000
+    peak = None
+    if memory:
+        tracemalloc.start()
+        generate()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    if data is None:
+        data = ProblemData.load(db)
+        db.close()
+    periods = sum(lesson.periods_per_week for lesson in data.lessons)
+    pending = sum(entry.get("periods", 1) for entry in result["pending"])
+    return {
+        "size": size,
+        "engine": engine,
+        "seed": seed,
+        "source": source,
+        "classes": len(data.classes),
+        "faculties": len(data.faculties),
+        "classrooms": len(data.classrooms),
+        "lessons": len(data.lessons),
+        "periods": periods,
+        "wall_ms": round(wall_ms, 2),
+        "peak_kb": round(peak / 1024, 1) if peak is not None else None,
+        "placed": result["stats"]["total_lessons_placed"],
+        "pending_periods": pending,
+        "placement_rate": round(1 - pending / periods, 4) if periods else 1.0,
+    }
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium"], choices=sorted(SIZES))
+    parser.add_argument("--engines", nargs="+", default=["greedy", "backtracking"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--source", choices=["snapshot", "db"], default="snapshot",
+                        help="generate from an in-memory snapshot, or from an in-memory SQLite database "
+                             "(includes load time)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run that measures peak memory")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--output", help="write to this file instead of stdout")
+    # School shape overrides, applied to every size
+    for name, kind in (("classes", int), ("courses", int), ("faculties", int), ("rooms", int), ("labs", int),
+                       ("fill", float), ("max-per-day", int), ("time-off", float), ("doubles", float),
+                       ("lab-share", float)):
+        parser.add_argument(f"--{name}", type=kind)
+    # Generator options
+    parser.add_argument("--optimize", action="store_true")
+    parser.add_argument("--optimize-time-limit", type=float)
+    parser.add_argument("--max-nodes", type=int)
+    parser.add_argument("--time-limit", type=float)
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    overrides = {
+        key: getattr(args, key)
+        for key in ("classes", "courses", "faculties", "rooms", "labs", "fill", "max_per_day", "time_off",
+                    "doubles", "lab_share")
+        if getattr(args, key) is not None
+    }
+    options = {
+        key: getattr(args, key)
+        for key in ("optimize_time_limit", "max_nodes", "time_limit")
+        if getattr(args, key) is not None
+    }
+    if args.optimize:
+        options["optimize"] = True
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    writer = csv.DictWriter(out, fieldnames=COLUMNS) if args.format == "csv" else None
+    if writer:
+        writer.writeheader()
+    try:
+        for size in args.sizes:
+            for engine in args.engines:
+                for run in range(args.repeat):
+                    seed = args.seed + run
+                    spec = {**SIZES[size], **overrides, "seed": seed}
+                    row = run_once(size, spec, engine, seed, args.source, options, not args.no_memory)
+                    if writer:
+                        writer.writerow(row)
+                    else:
+                        out.write(json.dumps(row) + "\n")
+                    out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
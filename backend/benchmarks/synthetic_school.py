@@ -0,0 +1,116 @@
+"""Synthetic school data for benchmarking the timetable generator
+
+A school is described by its size and constraint density and built
+deterministically from a seed, either as a ProblemData snapshot (no
+database involved) or as rows in a SQLAlchemy session.
+"""
+from typing import Any, Dict, List
+import math
+import random
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.database import Base
+from app.models import Class, Classroom, Course, Faculty, Lesson
+from app.services.problem_data import ProblemData, Record
+from app.services.slot_masks import DEFAULT_CALENDAR as CALENDAR
+
+COURSE_COLORS = ["#3B82F6", "#10B981", "#F59E0B", "#EF4444", "#8B5CF6", "#06B6D4", "#EC4899", "#84CC16"]
+
+# Named school sizes; any key can be overridden on the command line
+SIZES: Dict[str, Dict[str, Any]] = {
+    "small": {"classes": 6, "courses": 8},
+    "medium": {"classes": 24, "courses": 10},
+    "large": {"classes": 60, "courses": 12},
+    "xlarge": {"classes": 120, "courses": 14},
+}
+
+
+def build_rows(classes: int = 10, courses: int = 8, faculties: int = 0, rooms: int = 0, labs: int = 0,
+               fill: float = 0.85, max_per_day: int = 6, time_off: float = 0.05, doubles: float = 0.2,
+               lab_share: float = 0.15, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """Column values for every table of a synthetic school
+
+    ``fill`` is the share of each class's week that lessons occupy,
+    ``time_off`` the share of each faculty's week marked unavailable,
+    ``doubles`` the share of courses taught in double periods and
+    ``lab_share`` the share of courses that need a lab. Faculty, room and
+    lab counts default to values that keep the school comfortably solvable
+    at the default density.
+    """
+    rng = random.Random(seed)
+    periods_per_class = max(1, int(CALENDAR.slots_per_week * fill))
+    faculties = faculties or math.ceil(classes * periods_per_class / (len(CALENDAR.days) * max_per_day * 0.8))
+    labs = labs or max(1, math.ceil(classes * lab_share))
+    rooms = rooms or classes
+
+    rows: Dict[str, List[Dict[str, Any]]] = {
+        "courses": [], "classes": [], "faculties": [], "classrooms": [], "lessons": [],
+    }
+    for i in range(courses):
+        rows["courses"].append({
+            "id": i + 1, "title": f"Course {i + 1}", "abbreviation": f"C{i + 1}",
+            "color": COURSE_COLORS[i % len(COURSE_COLORS)], "available_slots": [],
+        })
+    for i in range(classes):
+        rows["classes"].append({
+            "id": i + 1, "name": f"Grade {i // 4 + 1}", "division": "ABCD"[i % 4],
+            "batch_count": 1, "restrictions": {}, "available_slots": [],
+        })
+    for i in range(faculties):
+        off = rng.sample(range(CALENDAR.slots_per_week), int(CALENDAR.slots_per_week * time_off))
+        rows["faculties"].append({
+            "id": i + 1, "first_name": "Faculty", "last_name": str(i + 1), "email": None, "phone": None,
+            "abbreviation": f"F{i + 1}", "title": "Mr.", "gender": "Male", "is_class_teacher": False,
+            "color": "#8B5CF6", "constraints": {"max_periods_per_day": max_per_day},
+            "time_off": [f"{CALENDAR.days[day]}-{period}" for day, period in map(CALENDAR.split_slot, off)],
+        })
+    for i in range(rooms + labs):
+        is_lab = i >= rooms
+        rows["classrooms"].append({
+            "id": i + 1, "name": f"Lab {i - rooms + 1}" if is_lab else f"Room {i + 1}",
+            "abbreviation": f"L{i - rooms + 1}" if is_lab else f"R{i + 1}", "color": "#10B981",
+            "classroom_type": "lab" if is_lab else "regular", "is_homeroom": not is_lab, "is_shared": True,
+            "requires_supervision": False, "availability": {},
+        })
+
+    lab_courses = set(rng.sample(range(courses), max(1, int(courses * lab_share)))) if lab_share else set()
+    double_courses = set(rng.sample(range(courses), int(courses * doubles)))
+    faculty_load = [0] * faculties
+    for cls in rows["classes"]:
+        # Spread the class's periods over its courses, at least one each
+        weights = [rng.random() + 0.5 for _ in range(courses)]
+        periods = [1 + int((periods_per_class - courses) * w / sum(weights)) for w in weights]
+        for course_index, count in enumerate(periods):
+            # Least loaded faculty takes the lesson
+            faculty_index = min(range(faculties), key=lambda f: (faculty_load[f], f))
+            faculty_load[faculty_index] += count
+            rows["lessons"].append({
+                "id": len(rows["lessons"]) + 1, "course_id": course_index + 1, "class_id": cls["id"],
+                "group": None, "faculty_id": faculty_index + 1, "periods_per_week": count,
+                "duration": 2 if course_index in double_courses and count >= 2 else 1,
+                "shared_faculty_ids": [], "classroom_type": "lab" if course_index in lab_courses else "regular",
+                "constraints": {},
+            })
+    return rows
+
+
+def build_snapshot(**spec) -> ProblemData:
+    """Synthetic school as a ProblemData snapshot"""
+    rows = build_rows(**spec)
+    return ProblemData(**{
+        table: [Record(**row) for row in rows[table]]
+        for table in ("classes", "lessons", "courses", "faculties", "classrooms")
+    })
+
+
+def build_session(**spec) -> Session:
+    """Synthetic school written into a fresh in-memory SQLite database"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    rows = build_rows(**spec)
+    for model, table in ((Course, "courses"), (Class, "classes"), (Faculty, "faculties"),
+                         (Classroom, "classrooms"), (Lesson, "lessons")):
+        db.bulk_insert_mappings(model, rows[table])
+    db.commit()
+    return db
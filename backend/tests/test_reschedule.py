@@ -0,0 +1,47 @@
+"""Regression tests for incremental rescheduling of stored versions"""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.models import Class, Classroom, Course, Faculty, Lesson, TimetableSlot
+from app.services.timetable_generator import TimetableGenerator
+from app.services.timetable_store import reschedule_and_store, save_timetable
+
+
+def make_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def cells(result):
+    return {
+        (class_name, day, period, cell["lesson_id"])
+        for class_name, schedule in result["timetable"].items()
+        for day, periods in schedule.items()
+        for period, cell in enumerate(periods)
+        if cell
+    }
+
+
+def test_noop_reschedule_keeps_co_taught_double_period():
+    db = make_session()
+    course = Course(title="Physics", abbreviation="PHY")
+    cls = Class(name="10", division="A")
+    primary = Faculty(first_name="Ada", last_name="L", abbreviation="AL")
+    co_teacher = Faculty(first_name="Bob", last_name="M", abbreviation="BM")
+    db.add_all([course, cls, primary, co_teacher, Classroom(name="Room 1", abbreviation="R1")])
+    db.flush()
+    db.add(Lesson(course_id=course.id, class_id=cls.id, faculty_id=primary.id, periods_per_week=3, duration=2,
+                  shared_faculty_ids=[co_teacher.id]))
+    db.commit()
+
+    result = TimetableGenerator(db, seed=2).generate()
+    version = save_timetable(db, result)
+    # Every co-taught period is stored once per faculty
+    assert db.query(TimetableSlot).filter(TimetableSlot.version_id == version.id).count() == 6
+
+    rescheduled = reschedule_and_store(db, version, {"save": False})
+    stats = rescheduled["stats"]
+    assert (stats["kept"], stats["ripped"], stats["displaced"], stats["replaced"]) == (3, 0, 0, 0)
+    assert cells(rescheduled) == cells(result)
@@ -151,6 +151,7 @@ function ClassroomForm({
     name: classroom?.name || '',
     abbreviation: classroom?.abbreviation || '',
     color: classroom?.color || '#10B981',
+    classroom_type: classroom?.classroom_type || 'regular',
     is_homeroom: classroom?.is_homeroom || false,
     is_shared: classroom?.is_shared ?? true,
   })
@@ -177,6 +178,16 @@ function ClassroomForm({
           required
         />
       </div>
+      <div>
+        <label className="block text-sm font-medium text-gray-700 mb-1">Room Type</label>
+        <input
+          type="text"
+          value={formData.classroom_type}
+          onChange={(e) => setFormData({ ...formData, classroom_type: e.target.value })}
+          className="input"
+          placeholder="regular, lab, sports..."
+        />
+      </div>
       <div>
         <label className="block text-sm font-medium text-gray-700 mb-1">Color</label>
         <input
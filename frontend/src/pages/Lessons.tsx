@@ -186,6 +186,7 @@ function LessonForm({
     faculty_id: lesson?.faculty_id || 0,
     periods_per_week: lesson?.periods_per_week || 1,
     duration: lesson?.duration || 1,
+    classroom_type: lesson?.classroom_type || 'regular',
   })
 
   return (
@@ -260,6 +261,16 @@ function LessonForm({
           />
         </div>
       </div>
+      <div>
+        <label className="block text-sm font-medium text-gray-700 mb-1">Room Type</label>
+        <input
+          type="text"
+          value={formData.classroom_type}
+          onChange={(e) => setFormData({ ...formData, classroom_type: e.target.value })}
+          className="input"
+          placeholder="regular, lab, sports..."
+        />
+      </div>
       <div className="flex gap-3 pt-4">
         <button type="submit" className="btn btn-primary flex-1">
           {lesson ? 'Update' : 'Create'}
@@ -1,14 +1,28 @@
-import { useState } from 'react'
-import { useMutation } from '@tanstack/react-query'
+import { useEffect, useState } from 'react'
+import { useMutation, useQuery } from '@tanstack/react-query'
 import { timetableAPI, TimetableResponse } from '@/services/api'
 import { Calendar, AlertCircle, Loader2 } from 'lucide-react'
 
-const DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-const PERIODS = [1, 2, 3, 4, 5, 6, 7, 8]
+// Used for timetables saved before the school week became configurable
+const DEFAULT_DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+const DEFAULT_PERIODS_PER_DAY = 8
 
 export default function Timetable() {
   const [timetableData, setTimetableData] = useState<TimetableResponse | null>(null)
 
+  // Show the last saved timetable instead of regenerating on every visit
+  const latestQuery = useQuery({
+    queryKey: ['timetable', 'latest'],
+    queryFn: () => timetableAPI.getLatest().then((response) => response.data),
+    retry: false,
+  })
+
+  useEffect(() => {
+    if (latestQuery.data && !timetableData) {
+      setTimetableData(latestQuery.data)
+    }
+  }, [latestQuery.data])
+
   const generateMutation = useMutation({
     mutationFn: timetableAPI.generate,
     onSuccess: (response) => {
@@ -20,6 +34,12 @@ export default function Timetable() {
     generateMutation.mutate()
   }
 
+  const calendar = timetableData?.calendar
+  const days = calendar?.days ?? DEFAULT_DAYS
+  const periods = Array.from({ length: calendar?.periods_per_day ?? DEFAULT_PERIODS_PER_DAY }, (_, i) => i + 1)
+  const dayPeriods = calendar?.day_periods ?? {}
+  const breaks = new Set(calendar?.breaks ?? [])
+
   return (
     <div>
       <div className="flex justify-between items-center mb-8">
@@ -73,7 +93,7 @@ export default function Timetable() {
             </div>
           </div>
 
-          {/* Timetables */}
+          {/* Timetables, laid out by the calendar they were generated with */}
           {Object.entries(timetableData.timetable).map(([className, schedule]) => (
             <div key={className} className="card">
               <h2 className="text-xl font-semibold text-gray-900 mb-4">{className}</h2>
@@ -82,7 +102,7 @@ export default function Timetable() {
                   <thead>
                     <tr>
                       <th className="border p-2 bg-gray-50 font-semibold">Period</th>
-                      {DAYS.map(day => (
+                      {days.map(day => (
                         <th key={day} className="border p-2 bg-gray-50 font-semibold">
                           {day}
                         </th>
@@ -90,13 +110,16 @@ export default function Timetable() {
                     </tr>
                   </thead>
                   <tbody>
-                    {PERIODS.map(period => (
+                    {periods.map(period => (
                       <tr key={period}>
                         <td className="border p-2 text-center font-medium bg-gray-50">
                           {period}
                         </td>
-                        {DAYS.map(day => {
+                        {days.map(day => {
                           const slot = schedule[day]?.[period - 1]
+                          if (breaks.has(period - 1) || period > (dayPeriods[day] ?? periods.length)) {
+                            return <td key={day} className="border p-2 bg-gray-100" />
+                          }
                           return (
                             <td key={day} className="border p-2">
                               {slot && typeof slot === 'object' ? (
@@ -130,6 +153,7 @@ export default function Timetable() {
                   <div key={index} className="p-3 bg-white rounded border">
                     <p className="font-medium text-gray-900">
                       {item.course} - {item.class}
+                      {item.periods ? ` (${item.periods} period${item.periods > 1 ? 's' : ''})` : ''}
                     </p>
                     <p className="text-sm text-gray-600">
                       Faculty: {item.faculty}
@@ -9,6 +9,20 @@ const api = axios.create({
   },
 })
 
+// School or term every request is scoped to; the backend uses "default" without one
+const TENANT_ID = import.meta.env.VITE_TENANT_ID
+if (TENANT_ID) {
+  api.defaults.headers.common['X-Tenant-ID'] = TENANT_ID
+}
+
+export function setTenant(tenantId: string | null) {
+  if (tenantId) {
+    api.defaults.headers.common['X-Tenant-ID'] = tenantId
+  } else {
+    delete api.defaults.headers.common['X-Tenant-ID']
+  }
+}
+
 // Types
 export interface Course {
   id?: number
@@ -47,6 +61,7 @@ export interface Classroom {
   name: string
   abbreviation: string
   color?: string
+  classroom_type?: string
   is_homeroom?: boolean
   is_shared?: boolean
   requires_supervision?: boolean
@@ -68,14 +83,25 @@ export interface Lesson {
 
 export interface TimetableSlot {
   lesson_id: number
+  shared_faculty_ids?: number[]
   course_name: string
   course_abbr: string
   faculty_name: string
   faculty_abbr: string
   classroom: string
+  classroom_id?: number | null
   color: string
 }
 
+export interface SchoolCalendar {
+  id?: number | null
+  name?: string
+  days: string[]
+  periods_per_day: number
+  day_periods: Record<string, number>
+  breaks: number[]
+}
+
 export interface TimetableResponse {
   timetable: Record<string, Record<string, (TimetableSlot | string)[]>>
   pending: Array<{
@@ -83,58 +109,157 @@ export interface TimetableResponse {
     course: string
     class: string
     faculty: string
+    periods?: number
+    blocks?: number[]
     reason: string
+    constraints?: Array<{
+      constraint: string
+      blocked_starts: number
+      binding: boolean
+    }>
   }>
   stats: {
     total_classes: number
     total_lessons_placed: number
     total_pending: number
+    [key: string]: any
   }
+  version_id?: number | null
+  calendar?: SchoolCalendar | null
+}
+
+export interface TimetableVersion {
+  id: number
+  label?: string | null
+  parent_id?: number | null
+  created_at: string
+  options: Record<string, any>
+  stats: Record<string, any>
+}
+
+export interface TimetableEntityView {
+  version_id: number
+  entity: Record<string, any>
+  timetable: Record<string, ((TimetableSlot & { class_name: string }) | string)[]>
+  total_periods: number
+}
+
+export interface TimetableGenerateOptions {
+  engine?: 'greedy' | 'backtracking'
+  max_nodes?: number
+  time_limit?: number
+  optimize?: boolean
+  optimize_time_limit?: number
+  runs?: number
+  workers?: number
+  score?: 'pending' | 'quality'
+  seed?: number
+  instrument?: boolean
+  save?: boolean
+  label?: string
+}
+
+export interface BulkCreateResult {
+  created: number
+  ids: number[]
+}
+
+export interface ListParams {
+  limit?: number
+  cursor?: number
+  fields?: string
+  [filter: string]: string | number | boolean | undefined
+}
+
+// Follow X-Next-Cursor until every page of a list endpoint is loaded
+async function fetchAll<T>(path: string, params: ListParams = {}) {
+  const items: T[] = []
+  let cursor: string | undefined
+  let response
+  do {
+    response = await api.get<T[]>(path, { params: { limit: 5000, ...params, cursor } })
+    items.push(...response.data)
+    cursor = response.headers['x-next-cursor']
+  } while (cursor)
+  return { ...response, data: items }
 }
 
 // API methods
 export const coursesAPI = {
-  getAll: () => api.get<Course[]>('/courses/'),
+  getAll: (params?: ListParams) => fetchAll<Course>('/courses/', params),
+  getPage: (params?: ListParams) => api.get<Course[]>('/courses/', { params }),
   getById: (id: number) => api.get<Course>(`/courses/${id}`),
   create: (data: Course) => api.post<Course>('/courses/', data),
   update: (id: number, data: Partial<Course>) => api.put<Course>(`/courses/${id}`, data),
   delete: (id: number) => api.delete(`/courses/${id}`),
+  bulkCreate: (data: Course[]) => api.post<BulkCreateResult>('/courses/bulk', data),
+  exportAll: () => api.get<Course[]>('/courses/export'),
 }
 
 export const classesAPI = {
-  getAll: () => api.get<Class[]>('/classes/'),
+  getAll: (params?: ListParams) => fetchAll<Class>('/classes/', params),
+  getPage: (params?: ListParams) => api.get<Class[]>('/classes/', { params }),
   getById: (id: number) => api.get<Class>(`/classes/${id}`),
   create: (data: Class) => api.post<Class>('/classes/', data),
   update: (id: number, data: Partial<Class>) => api.put<Class>(`/classes/${id}`, data),
   delete: (id: number) => api.delete(`/classes/${id}`),
+  bulkCreate: (data: Class[]) => api.post<BulkCreateResult>('/classes/bulk', data),
+  exportAll: () => api.get<Class[]>('/classes/export'),
 }
 
 export const facultiesAPI = {
-  getAll: () => api.get<Faculty[]>('/faculties/'),
+  getAll: (params?: ListParams) => fetchAll<Faculty>('/faculties/', params),
+  getPage: (params?: ListParams) => api.get<Faculty[]>('/faculties/', { params }),
   getById: (id: number) => api.get<Faculty>(`/faculties/${id}`),
   create: (data: Faculty) => api.post<Faculty>('/faculties/', data),
   update: (id: number, data: Partial<Faculty>) => api.put<Faculty>(`/faculties/${id}`, data),
   delete: (id: number) => api.delete(`/faculties/${id}`),
+  bulkCreate: (data: Faculty[]) => api.post<BulkCreateResult>('/faculties/bulk', data),
+  exportAll: () => api.get<Faculty[]>('/faculties/export'),
 }
 
 export const classroomsAPI = {
-  getAll: () => api.get<Classroom[]>('/classrooms/'),
+  getAll: (params?: ListParams) => fetchAll<Classroom>('/classrooms/', params),
+  getPage: (params?: ListParams) => api.get<Classroom[]>('/classrooms/', { params }),
   getById: (id: number) => api.get<Classroom>(`/classrooms/${id}`),
   create: (data: Classroom) => api.post<Classroom>('/classrooms/', data),
   update: (id: number, data: Partial<Classroom>) => api.put<Classroom>(`/classrooms/${id}`, data),
   delete: (id: number) => api.delete(`/classrooms/${id}`),
+  bulkCreate: (data: Classroom[]) => api.post<BulkCreateResult>('/classrooms/bulk', data),
+  exportAll: () => api.get<Classroom[]>('/classrooms/export'),
 }
 
 export const lessonsAPI = {
-  getAll: () => api.get<Lesson[]>('/lessons/'),
+  getAll: (params?: ListParams) => fetchAll<Lesson>('/lessons/', params),
+  getPage: (params?: ListParams) => api.get<Lesson[]>('/lessons/', { params }),
   getById: (id: number) => api.get<Lesson>(`/lessons/${id}`),
   create: (data: Lesson) => api.post<Lesson>('/lessons/', data),
   update: (id: number, data: Partial<Lesson>) => api.put<Lesson>(`/lessons/${id}`, data),
   delete: (id: number) => api.delete(`/lessons/${id}`),
+  bulkCreate: (data: Lesson[]) => api.post<BulkCreateResult>('/lessons/bulk', data),
+  exportAll: () => api.get<Lesson[]>('/lessons/export'),
+}
+
+export const calendarAPI = {
+  get: () => api.get<SchoolCalendar>('/calendar/'),
+  update: (data: Partial<SchoolCalendar>) => api.put<SchoolCalendar>('/calendar/', data),
 }
 
 export const timetableAPI = {
-  generate: () => api.post<TimetableResponse>('/timetable/generate'),
+  generate: (options?: TimetableGenerateOptions) =>
+    api.post<TimetableResponse>('/timetable/generate', options),
+  getVersions: () => api.get<TimetableVersion[]>('/timetable/versions'),
+  getVersion: (id: number) => api.get<TimetableResponse>(`/timetable/versions/${id}`),
+  getLatest: () => api.get<TimetableResponse>('/timetable/versions/latest'),
+  getClassVersion: (versionId: number, classId: number) =>
+    api.get<TimetableResponse>(`/timetable/versions/${versionId}/classes/${classId}`),
+  getFaculty: (facultyId: number, versionId?: number) =>
+    api.get<TimetableEntityView>(`/timetable/faculty/${facultyId}`, { params: { version_id: versionId } }),
+  getClassroom: (classroomId: number, versionId?: number) =>
+    api.get<TimetableEntityView>(`/timetable/classroom/${classroomId}`, { params: { version_id: versionId } }),
+  deleteVersion: (id: number) => api.delete(`/timetable/versions/${id}`),
+  reschedule: (versionId: number, changes: { lesson_ids?: number[]; max_moves?: number; label?: string } = {}) =>
+    api.post<TimetableResponse>(`/timetable/versions/${versionId}/reschedule`, changes),
 }
 
 export default api